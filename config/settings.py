@@ -14,6 +14,7 @@ import os
 from pathlib import Path
 from urllib.parse import urlparse
 from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -132,6 +133,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django_otp.middleware.OTPMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'store.middleware.SurrogateKeyMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
     'axes.middleware.AxesMiddleware',
@@ -237,6 +239,25 @@ VAT_RATE = float(os.getenv("VAT_RATE", "0"))
 COD_CHARGE = float(os.getenv("COD_CHARGE", "0"))
 COD_CONFIRMATION_REQUIRED = os.getenv("COD_CONFIRMATION_REQUIRED", "False").lower() == "true"
 
+# Catalog listing
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "24"))
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", "96"))
+CATALOG_PRICE_BUCKETS = [(0, 2000), (2000, 5000), (5000, 10000), (10000, None)]
+SEARCH_SUGGEST_LIMIT = int(os.getenv("SEARCH_SUGGEST_LIMIT", "8"))
+RECENTLY_VIEWED_SIZE = int(os.getenv("RECENTLY_VIEWED_SIZE", "8"))
+RELATED_PRODUCTS_TOP_N = int(os.getenv("RELATED_PRODUCTS_TOP_N", "12"))
+RELATED_PRODUCTS_MAX_BASKET = int(os.getenv("RELATED_PRODUCTS_MAX_BASKET", "40"))
+
+# Product feed (Meta / Google Merchant)
+# links in the feed must be absolute public URLs; ALLOWED_HOSTS can be "*"
+FEED_BASE_URL = os.getenv("FEED_BASE_URL", "").rstrip("/")
+if not FEED_BASE_URL:
+    if not DEBUG:
+        raise ImproperlyConfigured("Set FEED_BASE_URL (e.g. https://larosa.example) when DEBUG is off.")
+    FEED_BASE_URL = "http://localhost:8000"
+FEED_CURRENCY = os.getenv("FEED_CURRENCY", "PKR")
+FEED_REFRESH_MINUTES = int(os.getenv("FEED_REFRESH_MINUTES", "15"))
+
 
 USE_I18N = True
 
@@ -276,6 +297,13 @@ CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "django-db")
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    # incremental: only products changed since their feed rows were written
+    "refresh-product-feed": {
+        "task": "store.tasks.refresh_product_feed",
+        "schedule": crontab(minute=f"*/{FEED_REFRESH_MINUTES}"),
+    },
+}
 
 if REDIS_URL:
     CACHES = {
@@ -293,6 +321,36 @@ else:
         }
     }
 
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "600"))
+
+# python manage.py warm_cache, run once per deploy after migrate (render.yaml)
+WARM_CACHE_PRODUCTS = int(os.getenv("WARM_CACHE_PRODUCTS", "200"))
+WARM_CACHE_CONCURRENCY = int(os.getenv("WARM_CACHE_CONCURRENCY", "2"))
+
+# Cart lines: in the session, or one Redis hash per cart (store.cart_storage).
+# Redis is opt-in: CART_STORAGE=store.cart_storage.RedisCartStorage, with
+# CART_REDIS_ALIAS naming a django-redis cache.
+CART_STORAGE = os.getenv("CART_STORAGE", "store.cart_storage.SessionCartStorage")
+CART_REDIS_ALIAS = os.getenv("CART_REDIS_ALIAS", "default")
+CART_TTL = int(os.getenv("CART_TTL", str(60 * 60 * 24 * 30)))
+
+# CDN in front of the storefront: shared-cache lifetime and surrogate-key purges
+CDN_CACHE_TIMEOUT = int(os.getenv("CDN_CACHE_TIMEOUT", "300"))
+CDN_PURGE_BACKEND = os.getenv("CDN_PURGE_BACKEND", "store.cdn.LoggingPurgeBackend")
+CDN_PURGE_OPTIONS = {}
+if os.getenv("FASTLY_SERVICE_ID"):
+    CDN_PURGE_BACKEND = os.getenv("CDN_PURGE_BACKEND", "store.cdn.FastlyPurgeBackend")
+    CDN_PURGE_OPTIONS = {
+        "service_id": os.getenv("FASTLY_SERVICE_ID"),
+        "api_token": os.getenv("FASTLY_API_TOKEN", ""),
+    }
+CDN_PURGE_ASYNC = os.getenv("CDN_PURGE_ASYNC", str(bool(REDIS_URL))).lower() == "true"
+
+# Responsive image derivatives (stored next to the originals)
+IMAGE_DERIVATIVE_WIDTHS = [int(w) for w in os.getenv("IMAGE_DERIVATIVE_WIDTHS", "320,640,960,1600").split(",")]
+IMAGE_DERIVATIVE_QUALITY = int(os.getenv("IMAGE_DERIVATIVE_QUALITY", "80"))
+IMAGE_DERIVATIVES_ASYNC = os.getenv("IMAGE_DERIVATIVES_ASYNC", str(bool(REDIS_URL))).lower() == "true"
+
 USE_S3 = os.getenv("USE_S3", "False").lower() == "true"
 if USE_S3:
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
@@ -447,7 +447,7 @@ class ManualNotificationLogAdmin(admin.ModelAdmin):
 # =========================
 @admin.register(HomeBanner)
 class HomeBannerAdmin(admin.ModelAdmin):
-    list_display = ("title", "is_active", "created_at")
+    list_display = ("title", "is_active", "starts_at", "ends_at", "created_at")
     list_editable = ("is_active",)
     search_fields = ("title",)
     ordering = ("-created_at",)
@@ -458,7 +458,7 @@ class HomeBannerAdmin(admin.ModelAdmin):
 # =========================
 @admin.register(FeaturedBanner)
 class FeaturedBannerAdmin(admin.ModelAdmin):
-    list_display = ("preview", "title", "is_active", "sort_order", "created_at")
+    list_display = ("preview", "title", "is_active", "starts_at", "ends_at", "sort_order", "created_at")
     list_editable = ("is_active", "sort_order")
     list_filter = ("is_active",)
     search_fields = ("title", "subtitle")
@@ -513,7 +513,7 @@ class ProductResource(resources.ModelResource):
 class ProductAdmin(ImportExportModelAdmin, SimpleHistoryAdmin):
     resource_class = ProductResource
     list_display = ("title", "category", "price", "stock_summary", "is_active", "is_new", "created_at")
-    list_filter = ("is_active", "is_new", "category")
+    list_filter = ("is_active", "is_new", "in_stock", "category")
     search_fields = ("title", "sku")
     ordering = ("-created_at",)
     prepopulated_fields = {"slug": ("title",)}
@@ -532,17 +532,11 @@ class ProductAdmin(ImportExportModelAdmin, SimpleHistoryAdmin):
         js = ("store/admin/sortable.min.js", "store/admin/sortable.js")
 
     def stock_summary(self, obj):
-        variants = obj.variants.all()
-        if variants.exists():
-            total = sum(v.stock_qty for v in variants)
-            return f"{total} in stock"
+        if obj.has_variants:
+            return f"{obj.total_stock} in stock"
         return "No variants"
     stock_summary.short_description = "Stock"
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.prefetch_related("variants")
-
 
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(admin.ModelAdmin):
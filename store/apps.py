@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class StoreConfig(AppConfig):
     name = 'store'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .cart_storage import check_cart_storage
+
+        check_cart_storage()
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+
+
+PRODUCT_VERSION_KEY = "product:v:{}"
+VERSION_KEY = "version:{}"
+PAGE_KEY = "page:{}:{}:{}"
+
+# named versions bumped by store.signals
+CATALOG_VERSION = "catalog"    # product/category content and prices, listed availability
+STOCK_VERSION = "stock"        # exact stock counts (any variant save)
+SITE_VERSION = "site"
+
+
+def _seed():
+    # a fresh counter starts from the clock so an evicted key never
+    # comes back with a value an old fragment was stored under
+    return int(time.time() * 1000)
+
+
+# -----------------------
+# NAMED VERSIONS
+# -----------------------
+def get_version(name):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _seed(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    key = VERSION_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _seed(), timeout=None)
+
+
+def bump_version_on_commit(name):
+    transaction.on_commit(lambda: bump_version(name))
+
+
+# -----------------------
+# PRODUCT VERSIONS
+# -----------------------
+def get_product_versions(product_ids):
+    keys = {PRODUCT_VERSION_KEY.format(pid): pid for pid in product_ids}
+    found = cache.get_many(keys.keys())
+    versions = {keys[key]: value for key, value in found.items()}
+    for key, pid in keys.items():
+        if pid not in versions:
+            cache.add(key, _seed(), timeout=None)
+            versions[pid] = cache.get(key)
+    return versions
+
+
+def attach_product_versions(products):
+    """
+    Fetch the version counters for a page of products in one cache round
+    trip and stash them on the instances for the {% cache %} fragment keys.
+    """
+    products = list(products)
+    versions = get_product_versions([p.id for p in products])
+    for product in products:
+        product._cache_version = versions.get(product.id)
+    return products
+
+
+def bump_product_version(product_id):
+    key = PRODUCT_VERSION_KEY.format(product_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _seed(), timeout=None)
+
+
+def bump_product_version_on_commit(product_id):
+    transaction.on_commit(lambda: bump_product_version(product_id))
+
+
+# -----------------------
+# ANONYMOUS PAGE CACHE
+# -----------------------
+def page_version(name):
+    return get_version(f"page:{name}")
+
+
+def bump_page_version(name):
+    bump_version(f"page:{name}")
+
+
+def bump_page_version_on_commit(name):
+    bump_version_on_commit(f"page:{name}")
+
+
+def _is_anonymous_visitor(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if request.user.is_authenticated:
+        return False
+    if "messages" in request.COOKIES:
+        return False
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        # no session yet: nothing in the cart, no flash messages
+        return True
+
+    from .cart import get_cart
+    return not get_cart(request) and "_messages" not in request.session
+
+
+def _is_cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not getattr(response, "streaming", False)
+        and not response.cookies
+        and not request.META.get("CSRF_COOKIE_NEEDS_UPDATE")
+        # the session middleware sets its cookie after the view returns
+        and not getattr(getattr(request, "session", None), "modified", False)
+    )
+
+
+def is_shareable(request, response):
+    """True when ``response`` is the same for every visitor (page cache, CDN)."""
+    return _is_anonymous_visitor(request) and _is_cacheable_response(request, response)
+
+
+def shared_ttl(response, ttl):
+    """
+    Cap a shared-cache lifetime at ``response.cache_until`` when the view set
+    one (e.g. the next scheduled banner swap), so cached copies expire on time.
+    """
+    until = getattr(response, "cache_until", None)
+    if until is None:
+        return ttl
+    return min(ttl, max(0, int((until - timezone.now()).total_seconds())))
+
+
+def cache_anonymous_page(name, timeout=None):
+    """
+    Whole-response cache for visitors with nothing personal on the page:
+    anonymous, empty cart, no pending messages. Everyone else gets a normal
+    render. Entries are keyed by path (query strings such as utm_* are
+    ignored) and a version counter that model signals bump to purge.
+    """
+    def decorator(view):
+        @wraps(view)
+        def _wrapped(request, *args, **kwargs):
+            if not _is_anonymous_visitor(request):
+                return view(request, *args, **kwargs)
+
+            key = PAGE_KEY.format(name, page_version(name), request.path)
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                ttl = shared_ttl(response, timeout if timeout is not None else settings.PAGE_CACHE_TIMEOUT)
+                if ttl > 0 and _is_cacheable_response(request, response):
+                    cache.set(key, response, timeout=ttl)
+            patch_vary_headers(response, ("Cookie",))
+            return response
+        return _wrapped
+    return decorator
+
+
+# -----------------------
+# CONDITIONAL GET
+# -----------------------
+def has_pending_messages(request):
+    if "messages" in request.COOKIES:
+        return True
+    session = getattr(request, "session", None)
+    return session is not None and settings.SESSION_COOKIE_NAME in request.COOKIES and "_messages" in session
+
+
+def visitor_fingerprint(request):
+    """The per-visitor parts of a storefront page: who, csrf token, cart."""
+    from .cart import get_cart
+
+    cart = get_cart(request) if settings.SESSION_COOKIE_NAME in request.COOKIES else {}
+    # get_token() settles the secret this response's forms will carry, so a
+    # first visit (cookie about to be set) validates on the next request
+    get_token(request)
+    return [
+        request.user.pk or "",
+        request.META.get("CSRF_COOKIE", ""),
+        json.dumps(cart, sort_keys=True),
+    ]
+
+
+def page_etag(request, *parts):
+    """
+    ETag for a storefront page built from ``parts`` (whatever the content
+    depends on), the site layout version and the visitor fingerprint. None
+    (no conditional handling) while flash messages are waiting to be shown.
+    """
+    if has_pending_messages(request):
+        return None
+    raw = json.dumps([*parts, get_version(SITE_VERSION), *visitor_fingerprint(request)], default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
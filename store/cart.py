@@ -1,84 +1,226 @@
 from decimal import Decimal
-from .models import Product
 
-CART_SESSION_ID = "cart"
+from django.db.models import F, FilteredRelation, Q
 
-def get_cart(request):
-    return request.session.get(CART_SESSION_ID, {})
+from .caching import CATALOG_VERSION, get_version
+from .cart_storage import CART_SESSION_ID, CART_SUMMARY_ID, get_cart_storage
+from .models import Product, ProductVariant
 
-def save_cart(request, cart):
-    request.session[CART_SESSION_ID] = cart
-    request.session.modified = True
+class RequestCart:
+    """
+    The cart as one request sees it: lines read from storage once and
+    hydrated once, then shared by the view, the context processors and the
+    order service. The mutators below invalidate it, so a read after a
+    change in the same request sees the change.
+    """
 
-def cart_add_item(request, product_id, qty=1, color=None, size=None):
-    cart = get_cart(request)
-    key = str(product_id)
+    def __init__(self, request):
+        self.storage = get_cart_storage(request)
+        self._lines = None
+        self._hydrated = None
 
-    item = cart.get(key, {"qty": 0, "color": color, "size": size})
-    item["qty"] = int(item["qty"]) + int(qty)
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = self.storage.load()
+        return self._lines
 
-    # keep last selected variant
-    item["color"] = color or item.get("color")
-    item["size"] = size or item.get("size")
+    def items_with_totals(self):
+        if self._hydrated is None:
+            self._hydrated = _hydrate(self.lines)
+        return self._hydrated
 
-    cart[key] = item
-    save_cart(request, cart)
+    @property
+    def is_hydrated(self):
+        return self._hydrated is not None
 
-def cart_remove_item(request, product_id):
-    cart = get_cart(request)
-    key = str(product_id)
-    if key in cart:
-        del cart[key]
-        save_cart(request, cart)
+    def invalidate(self):
+        self._lines = None
+        self._hydrated = None
 
-def cart_items_with_totals(request):
-    cart = get_cart(request)
-    product_ids = [int(pid) for pid in cart.keys()] if cart else []
-    products = Product.objects.filter(id__in=product_ids, is_active=True)
+def request_cart(request):
+    cart = getattr(request, "_cart", None)
+    if cart is None:
+        cart = request._cart = RequestCart(request)
+    return cart
+
+def cart_storage(request):
+    """The configured backend (settings.CART_STORAGE), one per request."""
+    return request_cart(request).storage
+
+def get_cart(request):
+    return request_cart(request).lines
+
+def save_cart(request, cart):
+    cart_storage(request).replace(cart)
+    _refresh_summary(request)
+
+def _refresh_summary(request):
+    """Re-read and re-price the lines (one query), then store the badge summary."""
+    cart = request_cart(request)
+    cart.invalidate()
+    cart.storage.set_summary(_summarize(*cart.items_with_totals()))
+
+def _summarize(items, total):
+    """Badge count and subtotal, stamped with the catalog version the prices came from."""
+    return {
+        "count": sum(it["qty"] for it in items),
+        "total": str(total),
+        "version": get_version(CATALOG_VERSION),
+    }
+
+def cart_summary(request, fresh_prices=False):
+    """
+    The cart summary kept by the mutators below, so showing the badge costs
+    no query. ``fresh_prices`` recomputes it (one query) when a catalog edit
+    may have changed prices since it was written.
+    """
+    memo = request_cart(request)
+    cart = memo.lines
+    if not cart:
+        return {"count": 0, "total": Decimal("0.00")}
+
+    if memo.is_hydrated:
+        # the page already priced the lines; reuse them
+        items, total = memo.items_with_totals()
+        return {"count": sum(it["qty"] for it in items), "total": total}
+
+    storage = memo.storage
+    summary = storage.get_summary()
+    if summary is None or (fresh_prices and summary["version"] != get_version(CATALOG_VERSION)):
+        summary = _summarize(*memo.items_with_totals())
+        storage.set_summary(summary)
+    return {"count": summary["count"], "total": Decimal(summary["total"])}
+
+# -----------------------
+# LINE KEYS
+# -----------------------
+def line_key(product_id, variant_id=None):
+    """One line per variant ("v12"); products without variants use "p5"."""
+    if variant_id:
+        return f"v{variant_id}"
+    return f"p{product_id}"
+
+def parse_line_key(key):
+    """
+    "v12" -> ("v", 12), "p5" -> ("p", 5). Carts written before lines were
+    keyed by variant use the bare product id ("5"), read as a product line.
+    """
+    key = str(key)
+    if key[:1] in ("v", "p"):
+        return key[0], int(key[1:])
+    return "p", int(key)
+
+def _hydrate(cart):
+    """
+    Products (with their card image), variants and current stock for every
+    line in one joined query (variants LEFT JOINed onto their products),
+    then price, stock warnings and totals in a single pass.
+    """
+    if not cart:
+        return [], Decimal("0.00")
+
+    parsed = {key: parse_line_key(key) for key in cart}
+    product_ids = [pk for kind, pk in parsed.values() if kind == "p"]
+    variant_ids = [pk for kind, pk in parsed.values() if kind == "v"]
+
+    rows = Product.objects.cards().filter(is_active=True)
+    if variant_ids:
+        rows = rows.annotate(
+            line_variant=FilteredRelation(
+                "variants", condition=Q(variants__id__in=variant_ids, variants__is_active=True)
+            )
+        ).filter(Q(id__in=product_ids) | Q(line_variant__isnull=False)).annotate(
+            variant_id=F("line_variant__id"),
+            variant_color=F("line_variant__color"),
+            variant_size=F("line_variant__size"),
+            variant_stock=F("line_variant__stock_qty"),
+        )
+    else:
+        rows = rows.filter(id__in=product_ids)
+
+    products, variants = {}, {}
+    for row in rows:
+        product = products.setdefault(row.id, row)
+        if getattr(row, "variant_id", None):
+            variants[row.variant_id] = ProductVariant(
+                id=row.variant_id,
+                product=product,
+                color=row.variant_color,
+                size=row.variant_size,
+                stock_qty=row.variant_stock,
+                is_active=True,
+            )
 
     items = []
     total = Decimal("0.00")
-
-    prod_map = {p.id: p for p in products}
-    for pid_str, data in cart.items():
-        pid = int(pid_str)
-        product = prod_map.get(pid)
+    for key, data in cart.items():
+        kind, pk = parsed[key]
+        variant = variants.get(pk) if kind == "v" else None
+        product = variant.product if variant else (products.get(pk) if kind == "p" else None)
         if not product:
             continue
+
         qty = int(data.get("qty", 1))
+        # stock is tracked per variant; legacy lines of variant products
+        # are resolved from their color/size at checkout
+        stock = variant.stock_qty if variant else None
+        warning = ""
+        if variant and qty > stock:
+            warning = f"Only {stock} left in stock." if stock else "This size is sold out."
+        elif not variant and not product.in_stock:
+            warning = "This product is sold out."
+
         line_total = product.price * qty
         total += line_total
         items.append({
+            "key": key,
             "product": product,
+            "variant": variant,
             "qty": qty,
-            "color": data.get("color"),
-            "size": data.get("size"),
-            "line_total": line_total
+            "color": variant.color if variant else data.get("color"),
+            "size": variant.size if variant else data.get("size"),
+            "unit_price": product.price,
+            "line_total": line_total,
+            "stock": stock,
+            "warning": warning,
         })
 
     return items, total
-def cart_set_item(request, product_id, qty, color=None, size=None):
+
+# -----------------------
+# MUTATORS
+# -----------------------
+def cart_add_item(request, product_id, qty=1, color=None, size=None, variant_id=None):
+    key = line_key(product_id, variant_id)
+    if not variant_id and str(product_id) in get_cart(request):
+        key = str(product_id)    # keep adding to a pre-variant line
+    cart_storage(request).add(key, int(qty), color, size)
+    _refresh_summary(request)
+    return key
+
+def cart_remove_item(request, key):
+    cart_storage(request).remove(str(key))
+    _refresh_summary(request)
+
+def cart_items_with_totals(request):
+    return request_cart(request).items_with_totals()
+
+def cart_set_item(request, key, qty, color=None, size=None):
     """
-    Set exact qty for an item. If qty <= 0 remove it.
+    Set exact qty for a line already in the cart. If qty <= 0 remove it.
     """
-    cart = get_cart(request)
-    key = str(product_id)
+    key = str(key)
+    if key not in get_cart(request):
+        return
     qty = int(qty)
-
     if qty <= 0:
-        if key in cart:
-            del cart[key]
-            save_cart(request, cart)
+        cart_remove_item(request, key)
         return
 
-    item = cart.get(key, {"qty": 0, "color": color, "size": size})
-    item["qty"] = qty
-    item["color"] = color or item.get("color")
-    item["size"] = size or item.get("size")
-
-    cart[key] = item
-    save_cart(request, cart)
+    cart_storage(request).set(str(key), qty, color, size)
+    _refresh_summary(request)
 
 
 def clear_cart(request):
-    save_cart(request, {})
\ No newline at end of file
+    save_cart(request, {})
@@ -0,0 +1,199 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+CART_SESSION_ID = "cart"
+CART_SUMMARY_ID = "cart_summary"
+CART_ID_SESSION_KEY = "cart_id"
+
+
+def get_cart_storage(request):
+    return import_string(settings.CART_STORAGE)(request)
+
+
+def check_cart_storage():
+    """Called from StoreConfig.ready(): a Redis cart needs a django-redis cache alias."""
+    if not issubclass(import_string(settings.CART_STORAGE), RedisCartStorage):
+        return
+    try:
+        from django_redis import get_redis_connection
+        get_redis_connection(settings.CART_REDIS_ALIAS)
+    except (ImportError, InvalidCacheBackendError, NotImplementedError) as exc:
+        raise ImproperlyConfigured(
+            f"CART_STORAGE is RedisCartStorage but CACHES[{settings.CART_REDIS_ALIAS!r}] "
+            "(CART_REDIS_ALIAS) is not a django-redis cache."
+        ) from exc
+
+
+# -----------------------
+# SESSION (default)
+# -----------------------
+class SessionCartStorage:
+    """
+    The cart dict inside the Django session: {line: {"qty", "color", "size"}}.
+    Every change rewrites the whole session row.
+    """
+
+    def __init__(self, request):
+        self.session = request.session
+
+    def load(self):
+        return self.session.get(CART_SESSION_ID, {})
+
+    def _save(self, cart):
+        self.session[CART_SESSION_ID] = cart
+        self.session.modified = True
+
+    def add(self, line, qty, color=None, size=None):
+        cart = self.load()
+        item = cart.get(line, {"qty": 0, "color": color, "size": size})
+        item["qty"] = int(item["qty"]) + int(qty)
+        # keep last selected variant
+        item["color"] = color or item.get("color")
+        item["size"] = size or item.get("size")
+        cart[line] = item
+        self._save(cart)
+
+    def set(self, line, qty, color=None, size=None):
+        cart = self.load()
+        item = cart.get(line, {"qty": 0, "color": color, "size": size})
+        item["qty"] = int(qty)
+        item["color"] = color or item.get("color")
+        item["size"] = size or item.get("size")
+        cart[line] = item
+        self._save(cart)
+
+    def remove(self, line):
+        cart = self.load()
+        if line in cart:
+            del cart[line]
+            self._save(cart)
+
+    def replace(self, cart):
+        self._save(cart)
+
+    def get_summary(self):
+        return self.session.get(CART_SUMMARY_ID)
+
+    def set_summary(self, summary):
+        self.session[CART_SUMMARY_ID] = summary
+
+
+# -----------------------
+# REDIS HASH
+# -----------------------
+class RedisCartStorage:
+    """
+    One Redis hash per cart (line -> qty, so quantity changes are a single
+    HINCRBY) plus a hash of the chosen color/size per line and the summary.
+    Only the cart id lives in the session, written once when the cart is
+    created; every write renews the TTL of all three keys. A cart left in
+    the session by SessionCartStorage moves to Redis on first read.
+    """
+
+    def __init__(self, request, client=None):
+        self.session = request.session
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from django_redis import get_redis_connection
+            self._client = get_redis_connection(settings.CART_REDIS_ALIAS)
+        return self._client
+
+    def _keys(self, create=False):
+        cart_id = self.session.get(CART_ID_SESSION_KEY)
+        if cart_id is None:
+            if not create:
+                return None
+            cart_id = uuid.uuid4().hex
+            self.session[CART_ID_SESSION_KEY] = cart_id
+        base = f"cart:{cart_id}"
+        return base, f"{base}:opts", f"{base}:summary"
+
+    def _pipeline(self):
+        keys = self._keys(create=True)
+        return keys, self.client.pipeline(transaction=False)
+
+    def _renew(self, pipe, keys):
+        for key in keys:
+            pipe.expire(key, settings.CART_TTL)
+        pipe.execute()
+
+    def _options(self, pipe, opts_key, line, color, size):
+        if color:
+            pipe.hset(opts_key, f"{line}:color", color)
+        if size:
+            pipe.hset(opts_key, f"{line}:size", size)
+
+    def load(self):
+        keys = self._keys()
+        if keys is None:
+            legacy = self.session.get(CART_SESSION_ID)
+            if not legacy:
+                return {}
+            self.replace(legacy)
+            del self.session[CART_SESSION_ID]
+            self.session.pop(CART_SUMMARY_ID, None)
+            keys = self._keys()
+        lines_key, opts_key, _ = keys
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(lines_key)
+        pipe.hgetall(opts_key)
+        lines, opts = pipe.execute()
+
+        opts = {k.decode(): v.decode() for k, v in opts.items()}
+        cart = {}
+        for line, qty in lines.items():
+            line = line.decode()
+            cart[line] = {
+                "qty": int(qty),
+                "color": opts.get(f"{line}:color"),
+                "size": opts.get(f"{line}:size"),
+            }
+        return cart
+
+    def add(self, line, qty, color=None, size=None):
+        keys, pipe = self._pipeline()
+        pipe.hincrby(keys[0], line, int(qty))
+        self._options(pipe, keys[1], line, color, size)
+        self._renew(pipe, keys)
+
+    def set(self, line, qty, color=None, size=None):
+        keys, pipe = self._pipeline()
+        pipe.hset(keys[0], line, int(qty))
+        self._options(pipe, keys[1], line, color, size)
+        self._renew(pipe, keys)
+
+    def remove(self, line):
+        keys = self._keys()
+        if keys is None:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hdel(keys[0], line)
+        pipe.hdel(keys[1], f"{line}:color", f"{line}:size")
+        self._renew(pipe, keys)
+
+    def replace(self, cart):
+        keys, pipe = self._pipeline()
+        pipe.delete(keys[0], keys[1])
+        for line, item in cart.items():
+            pipe.hset(keys[0], line, int(item["qty"]))
+            self._options(pipe, keys[1], line, item.get("color"), item.get("size"))
+        self._renew(pipe, keys)
+
+    def get_summary(self):
+        keys = self._keys()
+        if keys is None:
+            return None
+        raw = self.client.get(keys[2])
+        return json.loads(raw) if raw else None
+
+    def set_summary(self, summary):
+        keys = self._keys(create=True)
+        self.client.set(keys[2], json.dumps(summary), ex=settings.CART_TTL)
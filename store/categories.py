@@ -0,0 +1,56 @@
+from .caching import bump_version_on_commit, get_version
+
+
+TREE_VERSION = "category-tree"
+
+_tree = None
+
+
+def path_ids(path):
+    """Category ids from the root down to the category itself."""
+    return [int(segment) for segment in path.split("/") if segment]
+
+
+class CategoryTree:
+    """
+    Every category loaded once and linked in memory. ``roots`` and each
+    node's ``nav_children`` only contain active categories, in menu order.
+    """
+
+    def __init__(self, categories):
+        self.by_id = {c.id: c for c in categories}
+        self.by_slug = {c.slug: c for c in categories}
+        self.roots = []
+        for category in categories:
+            category.nav_children = []
+        for category in categories:
+            if not category.is_active:
+                continue
+            if category.parent_id is None:
+                self.roots.append(category)
+            elif category.parent_id in self.by_id:
+                self.by_id[category.parent_id].nav_children.append(category)
+
+    def get(self, slug):
+        return self.by_slug.get(slug)
+
+    def ancestors(self, category):
+        return [self.by_id[pk] for pk in path_ids(category.path)[:-1] if pk in self.by_id]
+
+
+def category_tree():
+    """
+    The per-process tree, rebuilt with one query whenever the shared version
+    counter moves (any category save/delete, in any process).
+    """
+    global _tree
+    from .models import Category
+
+    version = get_version(TREE_VERSION)
+    if _tree is None or _tree[0] != version:
+        _tree = (version, CategoryTree(list(Category.objects.order_by("sort_order", "name"))))
+    return _tree[1]
+
+
+def invalidate_category_tree():
+    bump_version_on_commit(TREE_VERSION)
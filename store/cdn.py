@@ -0,0 +1,107 @@
+import json
+import logging
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_HEADER = "Surrogate-Key"
+
+# keys for pages that list things rather than show one object
+SITE_KEY = "site"            # every storefront page (header, nav, footer)
+PRODUCTS_KEY = "products"    # listings and the home grid (new/removed products)
+HOME_KEY = "home"            # the home page (banner line-up)
+
+
+def surrogate_key(obj):
+    """Product #5 -> "product-5"; strings pass through."""
+    if isinstance(obj, str):
+        return obj
+    return f"{obj._meta.model_name}-{obj.pk}"
+
+
+def add_surrogate_keys(response, *objects):
+    """Tag ``response`` with the objects (or raw keys) it rendered."""
+    keys = response.get(SURROGATE_HEADER, "").split()
+    for obj in objects:
+        if obj is None:
+            continue
+        key = surrogate_key(obj)
+        if key not in keys:
+            keys.append(key)
+    if keys:
+        response[SURROGATE_HEADER] = " ".join(keys)
+    return response
+
+
+# -----------------------
+# PURGE BACKENDS
+# -----------------------
+class LoggingPurgeBackend:
+    """Local/no-op stand-in: records what would have been purged."""
+
+    def __init__(self, **options):
+        pass
+
+    def purge(self, keys):
+        logger.info("CDN purge (no CDN configured): %s", " ".join(keys))
+
+
+class FastlyPurgeBackend:
+    """Soft-purges surrogate keys through the Fastly API (256 keys per call)."""
+
+    API_URL = "https://api.fastly.com/service/{}/purge"
+    BATCH = 256
+
+    def __init__(self, *, service_id, api_token, soft=True, **options):
+        self.service_id = service_id
+        self.api_token = api_token
+        self.soft = soft
+
+    def purge(self, keys):
+        headers = {"Fastly-Key": self.api_token, "Content-Type": "application/json"}
+        if self.soft:
+            headers["Fastly-Soft-Purge"] = "1"
+        for i in range(0, len(keys), self.BATCH):
+            payload = json.dumps({"surrogate_keys": keys[i:i + self.BATCH]}).encode("utf-8")
+            req = urllib.request.Request(
+                self.API_URL.format(self.service_id), data=payload, headers=headers, method="POST"
+            )
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                resp.read()
+
+
+def get_purge_backend():
+    return import_string(settings.CDN_PURGE_BACKEND)(**settings.CDN_PURGE_OPTIONS)
+
+
+# -----------------------
+# DISPATCH
+# -----------------------
+def purge(keys):
+    keys = sorted(set(keys))
+    if not keys:
+        return []
+    try:
+        get_purge_backend().purge(keys)
+    except Exception:
+        # the CDN TTL still bounds staleness; never fail the admin save
+        logger.exception("CDN purge failed for %s", " ".join(keys))
+    return keys
+
+
+def purge_on_commit(*objects):
+    keys = sorted({surrogate_key(obj) for obj in objects})
+
+    def _run():
+        if settings.CDN_PURGE_ASYNC:
+            from .tasks import purge_cdn_keys
+            purge_cdn_keys.delay(keys)
+        else:
+            purge(keys)
+
+    transaction.on_commit(_run)
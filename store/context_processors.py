@@ -1,21 +1,18 @@
-from .models import Category, SiteSettings, NavLink
-from .cart import cart_items_with_totals
+from django.utils.functional import SimpleLazyObject
 
-def nav_categories(request):
-    parents = Category.objects.filter(
-        is_active=True,
-        parent__isnull=True
-    ).prefetch_related("children")
+from .models import SiteSettings, NavLink
+from .categories import category_tree
+from .cart import cart_summary
 
+def nav_categories(request):
     return {
-        "nav_parents": parents
+        "nav_parents": category_tree().roots
     }
 def cart_context(request):
-    items, total = cart_items_with_totals(request)
-    count = sum(i["qty"] for i in items)
+    # evaluated only if a template shows them; the count never queries
     return {
-        "cart_count": count,
-        "cart_total": total,
+        "cart_count": SimpleLazyObject(lambda: cart_summary(request)["count"]),
+        "cart_total": SimpleLazyObject(lambda: cart_summary(request, fresh_prices=True)["total"]),
     }
 
 def site_settings(request):
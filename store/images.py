@@ -0,0 +1,156 @@
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# models whose ``image`` field gets resized copies
+DERIVATIVE_MODELS = ("store.ProductImage", "store.Category", "store.HomeBanner", "store.FeaturedBanner")
+
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+
+def derivative_name(name, width, fmt):
+    """products/suit.png -> products/suit.w640.webp"""
+    root, _ = os.path.splitext(name)
+    return f"{root}.w{width}.{EXTENSIONS[fmt]}"
+
+
+def srcset(field_file, fmt="webp"):
+    if not field_file:
+        return ""
+    widths = getattr(field_file.instance, "image_derivatives", None) or []
+    storage = field_file.storage
+    return ", ".join(f"{storage.url(derivative_name(field_file.name, w, fmt))} {w}w" for w in widths)
+
+
+# -----------------------
+# GENERATION
+# -----------------------
+def _load(storage, name):
+    with storage.open(name, "rb") as fh:
+        image = Image.open(fh)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        flat = Image.new("RGB", image.size, "white")
+        flat.paste(image, mask=image.getchannel("A"))
+        return flat
+    return image.convert("RGB") if image.mode != "RGB" else image
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    quality = settings.IMAGE_DERIVATIVE_QUALITY
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    else:
+        image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def generate_derivatives(field_file):
+    """
+    Write WebP and JPEG copies of ``field_file`` next to it for every
+    configured width narrower than the original. Returns the widths written.
+    """
+    storage = field_file.storage
+    image = _load(storage, field_file.name)
+
+    widths = []
+    for width in sorted(set(settings.IMAGE_DERIVATIVE_WIDTHS)):
+        if width >= image.width:
+            break
+        resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in EXTENSIONS:
+            name = derivative_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(_encode(resized, fmt)))
+        widths.append(width)
+    return widths
+
+
+def process_image(label, pk):
+    model = apps.get_model(label)
+    instance = model.objects.filter(pk=pk).first()
+    if not instance or not instance.image:
+        return []
+
+    name = instance.image.name
+    try:
+        widths = generate_derivatives(instance.image)
+    except FileNotFoundError:
+        logger.warning("Image file missing for %s #%s (%s)", label, pk, name)
+        return []
+    except Exception:
+        logger.exception("Image derivatives failed for %s #%s (%s)", label, pk, name)
+        return []
+
+    instance.refresh_from_db(fields=["image"])
+    if instance.image.name != name:
+        # replaced while we were resizing; the new upload has its own job
+        return []
+    # a bare UPDATE: a save would rerun the model's whole signal cascade
+    # (search reindex, catalog bumps, site-wide purges) for a list of widths
+    model.objects.filter(pk=pk).update(image_derivatives=widths)
+    instance.image_derivatives = widths
+    refresh_image_caches(instance)
+    return widths
+
+
+def refresh_image_caches(instance):
+    """Retire only the cached fragments and pages that render ``instance``'s image."""
+    from .caching import CATALOG_VERSION, bump_page_version_on_commit, bump_product_version_on_commit, bump_version_on_commit
+    from .categories import invalidate_category_tree
+    from .cdn import HOME_KEY, purge_on_commit
+    from .models import Product
+    from .services.banners import invalidate_active_banners
+
+    model_name = instance._meta.model_name
+    if model_name == "productimage":
+        # cards, listings (catalog ETag) and the detail page (updated_at)
+        Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+        bump_product_version_on_commit(instance.product_id)
+        bump_version_on_commit(CATALOG_VERSION)
+        purge_on_commit(f"product-{instance.product_id}")
+    elif model_name == "category":
+        # the cached tree holds the category rows; the home page shows them
+        invalidate_category_tree()
+        purge_on_commit(instance, HOME_KEY)
+    else:
+        invalidate_active_banners()
+        purge_on_commit(instance, HOME_KEY)
+    bump_page_version_on_commit("home")
+
+
+def delete_derivatives(storage, name, widths):
+    """Remove the resized copies of a replaced or cleared image."""
+    for width in widths:
+        for fmt in EXTENSIONS:
+            derivative = derivative_name(name, width, fmt)
+            if storage.exists(derivative):
+                storage.delete(derivative)
+
+
+def schedule_derivatives(instance):
+    label, pk = instance._meta.label, instance.pk
+
+    def _run():
+        if settings.IMAGE_DERIVATIVES_ASYNC:
+            from .tasks import generate_image_derivatives
+            generate_image_derivatives.delay(label, pk)
+        else:
+            process_image(label, pk)
+
+    transaction.on_commit(_run)
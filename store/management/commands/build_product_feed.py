@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from store.services.feed import refresh_feed, stream_feed
+
+
+class Command(BaseCommand):
+    help = "Regenerate the Meta/Google product feed rows (changed products only unless --full)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Re-render every product.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--format", choices=("csv", "xml"), default="csv")
+        parser.add_argument("--output", help="Also write the complete feed to this file.")
+
+    def handle(self, *args, **options):
+        rendered, removed = refresh_feed(full=options["full"], chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} product(s), removed {removed}."))
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as fh:
+                for chunk in stream_feed(options["format"], chunk_size=options["chunk_size"]):
+                    fh.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
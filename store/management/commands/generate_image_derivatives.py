@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from store.images import DERIVATIVE_MODELS, process_image
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/JPEG derivatives for uploaded storefront images."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Regenerate images that already have derivatives.")
+
+    def handle(self, *args, **options):
+        total = 0
+        for label in DERIVATIVE_MODELS:
+            model = apps.get_model(label)
+            images = model.objects.exclude(image="").exclude(image__isnull=True)
+            if not options["all"]:
+                images = images.filter(image_derivatives=[])
+            for pk in images.values_list("pk", flat=True).iterator():
+                process_image(label, pk)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} image(s)."))
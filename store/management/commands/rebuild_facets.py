@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.services.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed catalog facet tables from products and variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        count = rebuild_facets(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} facet count(s)."))
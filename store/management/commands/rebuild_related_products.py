@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from store.services.related import rebuild_related_products
+
+
+class Command(BaseCommand):
+    help = "Rebuild the co-purchase related products table from order lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-n", type=int, default=None)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        count = rebuild_related_products(top_n=options["top_n"], chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt related products for {count} product(s)."))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from store.services.inventory import reconcile_stock
+
+
+class Command(BaseCommand):
+    help = "Check the denormalized stock snapshot on Product against its variants."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Repair drifted products.")
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        drift = reconcile_stock(fix=options["fix"], chunk_size=options["chunk_size"])
+        for product_id, diff in drift:
+            changes = ", ".join(f"{field}: {stored!r} -> {actual!r}" for field, (stored, actual) in diff.items())
+            self.stdout.write(f"Product #{product_id}: {changes}")
+
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Stock snapshot is in sync."))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {len(drift)} product(s)."))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} product(s) drifted. Run with --fix to repair."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from store.services.orders import recount_sales
+
+
+class Command(BaseCommand):
+    help = "Recompute the best-selling counter on Product from order lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        fixed = recount_sales(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Updated sales count for {fixed} product(s)."))
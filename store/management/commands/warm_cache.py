@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from store.services.warmup import warm_cache, warm_urls
+
+
+class Command(BaseCommand):
+    help = "Render the home, category and product pages once so caches are hot after a deploy or import."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.WARM_CACHE_CONCURRENCY, help="Requests in flight at once."
+        )
+        parser.add_argument("--products", type=int, default=None, help="Only the N best-selling products.")
+        parser.add_argument("--slowest", type=int, default=5, help="List the N slowest pages.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        results = warm_cache(warm_urls(options["products"]), concurrency=options["concurrency"])
+        elapsed = time.perf_counter() - started
+        if not results:
+            self.stdout.write(self.style.WARNING("Nothing to warm."))
+            return
+
+        timings = sorted(seconds for _, _, seconds in results)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"Warmed {len(results)} page(s) in {elapsed:.2f}s "
+            f"(median {timings[len(timings) // 2] * 1000:.0f}ms, p95 {p95 * 1000:.0f}ms, "
+            f"max {timings[-1] * 1000:.0f}ms)"
+        )
+        for url, status, seconds in sorted(results, key=lambda r: r[2], reverse=True)[:options["slowest"]]:
+            self.stdout.write(f"  {seconds * 1000:7.0f}ms  {status}  {url}")
+
+        failed = [(url, status) for url, status, _ in results if status >= 400]
+        for url, status in failed:
+            self.stderr.write(f"{status} {url}")
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{len(failed)} page(s) failed."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Cache warm-up complete."))
@@ -1,5 +1,9 @@
 from django.conf import settings
 from django.http import HttpResponseForbidden
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .caching import is_shareable, shared_ttl
+from .cdn import SITE_KEY, SURROGATE_HEADER, add_surrogate_keys
 
 
 class AdminIPAllowlistMiddleware:
@@ -65,3 +69,34 @@ class RateLimitMiddleware:
                     break
 
         return self.get_response(request)
+
+
+class SurrogateKeyMiddleware:
+    """
+    Views tag storefront responses with a Surrogate-Key header (store.cdn).
+    Tagged responses every visitor would see identically get a shared-cache
+    lifetime for the CDN, purged by key from model signals; anything
+    personal (including pages whose forms carry a CSRF token) is marked
+    private and untagged.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not response.has_header(SURROGATE_HEADER):
+            return response
+
+        if not is_shareable(request, response):
+            del response[SURROGATE_HEADER]
+            patch_cache_control(response, private=True)
+            return response
+
+        add_surrogate_keys(response, SITE_KEY)
+        if not response.has_header("Cache-Control"):
+            # browsers revalidate (ETags); the CDN holds it until purged
+            ttl = shared_ttl(response, settings.CDN_CACHE_TIMEOUT)
+            patch_cache_control(response, public=True, max_age=0, s_maxage=ttl)
+        patch_vary_headers(response, ("Cookie",))
+        return response
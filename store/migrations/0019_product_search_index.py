@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+# frozen copy of the schema as it was when this migration was written; the
+# runtime index code lives in store.search
+SEARCH_TABLE = "store_product_search"
+
+
+def create_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            " product_id bigint PRIMARY KEY REFERENCES store_product(id) ON DELETE CASCADE"
+            " DEFERRABLE INITIALLY DEFERRED,"
+            " document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_gin ON {SEARCH_TABLE} USING GIN (document)"
+        )
+    elif vendor == "sqlite":
+        # rowid doubles as the product id
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            " title, sku, category, description, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def populate_search_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (product_id, document)"
+            " SELECT p.id,"
+            " setweight(to_tsvector('simple', p.title), 'A')"
+            " || setweight(to_tsvector('simple', p.sku), 'A')"
+            " || setweight(to_tsvector('simple', c.name), 'B')"
+            " || setweight(to_tsvector('simple', p.description), 'C')"
+            " FROM store_product p JOIN store_category c ON c.id = p.category_id"
+            " WHERE p.is_active ON CONFLICT (product_id) DO NOTHING"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, sku, category, description)"
+            " SELECT p.id, p.title, p.sku, c.name, p.description"
+            " FROM store_product p JOIN store_category c ON c.id = p.category_id"
+            " WHERE p.is_active"
+        )
+
+
+def drop_search_index(schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def forwards(apps, schema_editor):
+    create_search_index(schema_editor)
+    populate_search_index(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0018_historicalmessagetemplate_is_html_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
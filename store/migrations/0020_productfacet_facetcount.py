@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_product_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.PositiveIntegerField(default=0, help_text='Category id, 0 = whole catalog')),
+                ('facet', models.CharField(choices=[('color', 'Color'), ('size', 'Size'), ('price', 'Price'), ('stock', 'Availability')], max_length=20)),
+                ('value', models.CharField(max_length=60)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('scope', 'facet', 'value')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.PositiveIntegerField(default=0, help_text='Category id the product counted under')),
+                ('facet', models.CharField(choices=[('color', 'Color'), ('size', 'Size'), ('price', 'Price'), ('stock', 'Availability')], max_length=20)),
+                ('value', models.CharField(max_length=60)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='store.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facet', 'value'], name='store_produ_facet_3bcb4f_idx')],
+                'unique_together': {('product', 'facet', 'value')},
+            },
+        ),
+    ]
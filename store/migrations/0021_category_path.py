@@ -0,0 +1,50 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+def fill_paths(apps, schema_editor):
+    Category = apps.get_model("store", "Category")
+    parents = dict(Category.objects.values_list("id", "parent_id"))
+
+    def build(pk, seen=()):
+        parent_id = parents.get(pk)
+        segment = f"{pk:08d}/"
+        if parent_id is None or parent_id in seen or parent_id not in parents:
+            return segment
+        return build(parent_id, seen + (pk,)) + segment
+
+    for pk in parents:
+        path = build(pk)
+        Category.objects.filter(pk=pk).update(path=path, depth=path.count("/") - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_productfacet_facetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='historicalcategory',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='historicalcategory',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_paths, migrations.RunPython.noop),
+    ]
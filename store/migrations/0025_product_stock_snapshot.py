@@ -0,0 +1,110 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+def _split(value):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def _join(values):
+    seen = []
+    for value in values:
+        value = value.strip()
+        if value and value not in seen:
+            seen.append(value)
+    return ", ".join(seen)[:255]
+
+
+def fill_snapshots(apps, schema_editor):
+    # computed here rather than with store.services.inventory, so later
+    # changes to the runtime snapshot never alter this backfill
+    Product = apps.get_model("store", "Product")
+    ProductVariant = apps.get_model("store", "ProductVariant")
+
+    variants = {}
+    rows = ProductVariant.objects.filter(is_active=True).order_by("id").values_list("product_id", "color", "size", "stock_qty")
+    for product_id, color, size, qty in rows.iterator():
+        variants.setdefault(product_id, []).append((color, size, qty))
+
+    for product in Product.objects.only("colors", "sizes").iterator():
+        rows = variants.get(product.id, [])
+        if not rows:
+            snapshot = {
+                "has_variants": False,
+                "total_stock": 0,
+                "in_stock": True,
+                "available_colors": _join(_split(product.colors)),
+                "available_sizes": _join(_split(product.sizes)),
+            }
+        else:
+            stocked = [(color, size) for color, size, qty in rows if qty > 0]
+            snapshot = {
+                "has_variants": True,
+                "total_stock": sum(qty for _, _, qty in rows),
+                "in_stock": bool(stocked),
+                "available_colors": _join(color for color, _ in stocked),
+                "available_sizes": _join(size for _, size in stocked),
+            }
+        Product.objects.filter(pk=product.pk).update(**snapshot)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0024_product_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='available_colors',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='available_sizes',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='has_variants',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='in_stock',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='total_stock',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='available_colors',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='available_sizes',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='has_variants',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='in_stock',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='total_stock',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_snapshots, migrations.RunPython.noop),
+    ]
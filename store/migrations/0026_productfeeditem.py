@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0025_product_stock_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFeedItem',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_item', serialize=False, to='store.product')),
+                ('csv_rows', models.TextField(blank=True)),
+                ('xml_items', models.TextField(blank=True)),
+                ('source_updated_at', models.DateTimeField(help_text='Product.updated_at this was rendered from')),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
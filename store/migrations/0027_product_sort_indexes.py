@@ -0,0 +1,57 @@
+# Generated by Django 5.2.10 on 2026-10-17 06:46
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def fill_sales_counts(apps, schema_editor):
+    Product = apps.get_model("store", "Product")
+    OrderItem = apps.get_model("store", "OrderItem")
+
+    sold = (
+        OrderItem.objects.exclude(order__status__in=("cancelled", "refunded"))
+        .values("product_id").annotate(total=Sum("qty")).values_list("product_id", "total")
+    )
+    for product_id, total in sold.iterator():
+        Product.objects.filter(pk=product_id).update(sales_count=total or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0026_productfeeditem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='sales_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='product_active_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'price', 'id'], name='product_active_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'price', 'id'], name='product_active_cat_price'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'created_at', 'id'], name='product_active_cat_newest'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'sales_count', 'id'], name='product_active_bestselling'),
+        ),
+        migrations.RunPython(fill_sales_counts, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Concat, Substr
 from simple_history.models import HistoricalRecords
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
@@ -23,6 +26,9 @@ def _unique_slug(model, value, slug_field="slug"):
 # =========================
 # CATEGORY
 # =========================
+CATEGORY_PATH_STEP = 8
+
+
 class Category(models.Model):
     history = HistoricalRecords()
     name = models.CharField(max_length=120)
@@ -30,6 +36,7 @@ class Category(models.Model):
 
     # Admin controlled category card/banner
     image = models.ImageField(upload_to="categories/", blank=True, null=True)
+    image_derivatives = models.JSONField(default=list, blank=True, editable=False)  # widths generated by store.images
     tagline = models.CharField(max_length=120, blank=True)
 
     # Parent -> child (Mega menu support)
@@ -44,14 +51,54 @@ class Category(models.Model):
     is_active = models.BooleanField(default=True)
     sort_order = models.PositiveIntegerField(default=0)
 
+    # Materialized path: zero padded ids root -> self, e.g. "00000003/00000012/".
+    # "this category and everything below it" is a single path__startswith.
+    path = models.CharField(max_length=255, blank=True, default="", db_index=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ["sort_order", "name"]
 
+    def clean(self):
+        if self.pk and self.parent_id:
+            parent_path = Category.objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+            if self.parent_id == self.pk or (self.path and parent_path.startswith(self.path)):
+                raise ValidationError({"parent": "A category cannot be nested under itself or one of its children."})
+
+    def _build_path(self):
+        segment = f"{self.pk:0{CATEGORY_PATH_STEP}d}/"
+        if not self.parent_id:
+            return segment
+        parent_path = Category.objects.filter(pk=self.parent_id).values_list("path", flat=True).first() or ""
+        return parent_path + segment
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = _unique_slug(Category, self.name)
+
+        old_path = ""
+        if self.pk:
+            old_path = Category.objects.filter(pk=self.pk).values_list("path", flat=True).first() or ""
+            self.path = self._build_path()
+            self.depth = self.path.count("/") - 1
+
+        self._moved = bool(old_path) and old_path != self.path
+        self._previous_path = old_path
+        if self._moved:
+            # re-root the whole subtree in one statement
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(self.path), Substr("path", len(old_path) + 1)),
+                depth=F("depth") + (self.depth - (old_path.count("/") - 1)),
+            )
+
         super().save(*args, **kwargs)
 
+        if not old_path:
+            # new row: the id is only known now
+            self.path = self._build_path()
+            self.depth = self.path.count("/") - 1
+            Category.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+
     def __str__(self):
         if self.parent:
             return f"{self.parent.name} -> {self.name}"
@@ -61,8 +108,24 @@ class Category(models.Model):
 # =========================
 # PRODUCT
 # =========================
+class ProductQuerySet(models.QuerySet):
+    def cards(self):
+        """
+        Everything a product card renders in one query: the category via a
+        join and the first image name via a correlated subquery.
+        """
+        first_image = ProductImage.objects.filter(
+            product=OuterRef("pk")
+        ).order_by("sort_order", "id")
+        return self.select_related("category").annotate(
+            primary_image=Subquery(first_image.values("image")[:1]),
+            primary_image_widths=Subquery(first_image.values("image_derivatives")[:1]),
+        )
+
+
 class Product(models.Model):
     history = HistoricalRecords()
+    objects = ProductQuerySet.as_manager()
     category = models.ForeignKey(
         Category,
         on_delete=models.CASCADE,
@@ -95,6 +158,16 @@ class Product(models.Model):
     is_active = models.BooleanField(default=True)
     is_new = models.BooleanField(default=False)
 
+    # Availability snapshot of the active variants, kept in step by
+    # store.services.inventory (see reconcile_stock for drift repair)
+    has_variants = models.BooleanField(default=False, editable=False)
+    total_stock = models.PositiveIntegerField(default=0, editable=False)
+    in_stock = models.BooleanField(default=True, db_index=True, editable=False)
+    available_colors = models.CharField(max_length=255, blank=True, editable=False)
+    available_sizes = models.CharField(max_length=255, blank=True, editable=False)
+    # units sold in non-cancelled orders; bumped at checkout, see recount_sales
+    sales_count = models.PositiveIntegerField(default=0, editable=False)
+
     invoice_no = models.CharField(max_length=30, blank=True)
     vat_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     vat_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -102,9 +175,19 @@ class Product(models.Model):
     cod_confirmed = models.BooleanField(default=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # also touched when the product's images or variants change
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-created_at"]
+        # one per listing sort mode (see store.views.catalog.SORT_ORDERS)
+        indexes = [
+            models.Index(fields=["is_active", "created_at", "id"], name="product_active_newest"),
+            models.Index(fields=["is_active", "price", "id"], name="product_active_price"),
+            models.Index(fields=["is_active", "category", "price", "id"], name="product_active_cat_price"),
+            models.Index(fields=["is_active", "category", "created_at", "id"], name="product_active_cat_newest"),
+            models.Index(fields=["is_active", "sales_count", "id"], name="product_active_bestselling"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -117,6 +200,34 @@ class Product(models.Model):
     def size_list(self):
         return [s.strip() for s in self.sizes.split(",") if s.strip()]
 
+    def available_color_list(self):
+        return [c.strip() for c in self.available_colors.split(",") if c.strip()]
+
+    def available_size_list(self):
+        return [s.strip() for s in self.available_sizes.split(",") if s.strip()]
+
+    @property
+    def cache_version(self):
+        if not hasattr(self, "_cache_version"):
+            from .caching import get_product_versions
+            self._cache_version = get_product_versions([self.id])[self.id]
+        return self._cache_version
+
+    @property
+    def primary_image_file(self):
+        if not hasattr(self, "primary_image"):
+            first = self.images.first()
+            return first.image if first else None
+        if not self.primary_image:
+            return None
+        # unsaved stand-in so templates get a real FieldFile with srcset data
+        return ProductImage(image=self.primary_image, image_derivatives=self.primary_image_widths or []).image
+
+    @property
+    def primary_image_url(self):
+        image = self.primary_image_file
+        return image.url if image else ""
+
     def __str__(self):
         return self.title
 
@@ -132,6 +243,7 @@ class ProductImage(models.Model):
         related_name="images"
     )
     image = models.ImageField(upload_to="products/")
+    image_derivatives = models.JSONField(default=list, blank=True, editable=False)  # widths generated by store.images
     alt_text = models.CharField(max_length=150, blank=True)
     sort_order = models.PositiveIntegerField(default=0)
 
@@ -160,6 +272,76 @@ class ProductVariant(models.Model):
 
     def __str__(self):
         return f"{self.product.title} ({self.color or '-'}, {self.size or '-'})"
+
+
+# =========================
+# CATALOG FACETS (derived from Product + ProductVariant)
+# =========================
+FACET_CHOICES = (
+    ("color", "Color"),
+    ("size", "Size"),
+    ("price", "Price"),
+    ("stock", "Availability"),
+)
+
+
+class ProductFacet(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="facets")
+    scope = models.PositiveIntegerField(default=0, help_text="Category id the product counted under")
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=60)
+
+    class Meta:
+        unique_together = ("product", "facet", "value")
+        indexes = [models.Index(fields=["facet", "value"])]
+
+    def __str__(self):
+        return f"{self.product_id} {self.facet}={self.value}"
+
+
+class FacetCount(models.Model):
+    scope = models.PositiveIntegerField(default=0, help_text="Category id, 0 = whole catalog")
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=60)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("scope", "facet", "value")
+
+    def __str__(self):
+        return f"[{self.scope}] {self.facet}={self.value}: {self.count}"
+
+
+# =========================
+# RELATED PRODUCTS (derived from OrderItem co-purchases)
+# =========================
+class ProductRelation(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="relations")
+    related = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="relation_targets")
+    rank = models.PositiveSmallIntegerField(default=0)
+    score = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("product", "rank")
+        ordering = ["product", "rank"]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.related_id} (#{self.rank})"
+
+
+# =========================
+# PRODUCT FEED (rendered per product, streamed by store.services.feed)
+# =========================
+class ProductFeedItem(models.Model):
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name="feed_item")
+    csv_rows = models.TextField(blank=True)
+    xml_items = models.TextField(blank=True)
+    source_updated_at = models.DateTimeField(help_text="Product.updated_at this was rendered from")
+    generated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Feed item for product {self.product_id}"
+
 # =========================
 # HOME HERO BANNER
 # =========================
@@ -168,11 +350,15 @@ class HomeBanner(models.Model):
     title = models.CharField(max_length=200)
     subtitle = models.CharField(max_length=300, blank=True)
     image = models.ImageField(upload_to="banners/")
+    image_derivatives = models.JSONField(default=list, blank=True, editable=False)  # widths generated by store.images
 
     button_text = models.CharField(max_length=50, default="Shop Now")
     button_link = models.CharField(max_length=200, default="/products/")
 
     is_active = models.BooleanField(default=True)
+    # optional schedule window; blank means "from now" / "until switched off"
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
     invoice_no = models.CharField(max_length=30, blank=True)
     vat_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     vat_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -184,6 +370,10 @@ class HomeBanner(models.Model):
     class Meta:
         ordering = ["-created_at"]
 
+    def clean(self):
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({"ends_at": "End must be after the start."})
+
     def __str__(self):
         return self.title
 
@@ -197,11 +387,15 @@ class FeaturedBanner(models.Model):
     subtitle = models.CharField(max_length=300, blank=True)
 
     image = models.ImageField(upload_to="featured/")
+    image_derivatives = models.JSONField(default=list, blank=True, editable=False)  # widths generated by store.images
 
     button_text = models.CharField(max_length=50, default="Explore Collection")
     button_link = models.CharField(max_length=200, default="/products/")
 
     is_active = models.BooleanField(default=True)
+    # optional schedule window; blank means "from now" / "until switched off"
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
     sort_order = models.PositiveIntegerField(default=0)
 
     invoice_no = models.CharField(max_length=30, blank=True)
@@ -215,6 +409,10 @@ class FeaturedBanner(models.Model):
     class Meta:
         ordering = ["sort_order", "-created_at"]
 
+    def clean(self):
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({"ends_at": "End must be after the start."})
+
     def __str__(self):
         return self.title
 class Order(models.Model):
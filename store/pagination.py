@@ -0,0 +1,134 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor, page_size):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @property
+    def has_next(self):
+        return bool(self.next_cursor)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def _split(ordering):
+    return [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+
+
+def _encode_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _pack(values):
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unpack(token):
+    if not token:
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        return None
+
+
+def encode_cursor(obj, ordering):
+    return _pack([_encode_value(getattr(obj, name)) for name, _ in _split(ordering)])
+
+
+def decode_cursor(token, model, ordering):
+    """
+    Turn a cursor token back into typed values. Returns None for anything
+    that does not decode cleanly so callers can fall back to the first page.
+    """
+    values = _unpack(token)
+    fields = _split(ordering)
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+
+    typed = []
+    for (name, _), value in zip(fields, values):
+        try:
+            typed.append(model._meta.get_field(name).to_python(value))
+        except (FieldDoesNotExist, ValidationError):
+            return None
+    return typed
+
+
+def _after(ordering, values):
+    # (a, b, id) > (va, vb, vid) expanded into
+    # a > va OR (a = va AND b > vb) OR (a = va AND b = vb AND id > vid)
+    fields = _split(ordering)
+    condition = Q()
+    for i, (name, descending) in enumerate(fields):
+        lookup = "lt" if descending else "gt"
+        clause = Q(**{f"{name}__{lookup}": values[i]})
+        for j, (prev_name, _) in enumerate(fields[:i]):
+            clause &= Q(**{prev_name: values[j]})
+        condition |= clause
+    return condition
+
+
+def keyset_paginate(queryset, *, ordering, cursor=None, page_size=24):
+    """
+    Paginate by the last seen row instead of an offset. ``ordering`` must end
+    with a unique column (normally ``id``) so rows inserted while a shopper is
+    scrolling never shift or duplicate items between pages.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor, queryset.model, ordering)
+    if values is not None:
+        queryset = queryset.filter(_after(ordering, values))
+
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size]
+    next_cursor = encode_cursor(items[-1], ordering) if len(rows) > page_size else None
+    return KeysetPage(items, next_cursor, page_size)
+
+
+def ranked_paginate(ranked, *, cursor=None, page_size=24):
+    """
+    Keyset pages over an already ranked [(id, score)] list (search results,
+    best first). The cursor carries the last row's (score, id): the next page
+    starts right after that id, or, if it dropped out of the results, at the
+    first row ranked below it. Items of the returned page are ids.
+    """
+    start = 0
+    values = _unpack(cursor)
+    if isinstance(values, list) and len(values) == 2:
+        try:
+            score, last_id = float(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            score = last_id = None
+        if last_id is not None:
+            ids = [pk for pk, _ in ranked]
+            if last_id in ids:
+                start = ids.index(last_id) + 1
+            else:
+                start = next(
+                    (i for i, row in enumerate(ranked) if (row[1], row[0]) < (score, last_id)), len(ranked)
+                )
+
+    rows = ranked[start:start + page_size]
+    next_cursor = None
+    if len(ranked) > start + page_size:
+        next_cursor = _pack([rows[-1][1], rows[-1][0]])
+    return KeysetPage([pk for pk, _ in rows], next_cursor, page_size)
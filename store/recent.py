@@ -0,0 +1,33 @@
+from django.conf import settings
+
+from .caching import attach_product_versions
+from .models import Product
+
+RECENT_SESSION_ID = "recent"
+
+
+def recently_viewed_ids(request):
+    return list(request.session.get(RECENT_SESSION_ID, []))
+
+
+def remember_product(request, product_id):
+    """
+    Move ``product_id`` to the front of the fixed-size ring of ids. Returns
+    False (and leaves the session untouched, so no write) when it already
+    is the most recent view.
+    """
+    ids = recently_viewed_ids(request)
+    if ids and ids[0] == product_id:
+        return False
+    ids = [product_id, *(pid for pid in ids if pid != product_id)][:settings.RECENTLY_VIEWED_SIZE]
+    request.session[RECENT_SESSION_ID] = ids
+    return True
+
+
+def recently_viewed_products(request, exclude=(), limit=4):
+    """The ring hydrated through the product-card projection, most recent first."""
+    ids = [pid for pid in recently_viewed_ids(request) if pid not in exclude][:limit]
+    if not ids:
+        return []
+    by_id = {p.id: p for p in Product.objects.cards().filter(id__in=ids, is_active=True)}
+    return attach_product_versions([by_id[pid] for pid in ids if pid in by_id])
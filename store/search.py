@@ -0,0 +1,123 @@
+import re
+
+from django.db import connection
+
+
+SEARCH_TABLE = "store_product_search"
+MAX_RESULTS = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_supported():
+    return connection.vendor in ("postgresql", "sqlite")
+
+
+# -----------------------
+# INDEX MAINTENANCE
+# -----------------------
+def _fields(product):
+    return (
+        product.title or "",
+        product.sku or "",
+        product.category.name if product.category_id else "",
+        product.description or "",
+    )
+
+
+def index_product(product):
+    if not is_supported():
+        return
+    if not product.is_active:
+        remove_product(product.pk)
+        return
+
+    title, sku, category, description = _fields(product)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, document) VALUES (%s,"
+                " setweight(to_tsvector('simple', %s), 'A')"
+                " || setweight(to_tsvector('simple', %s), 'A')"
+                " || setweight(to_tsvector('simple', %s), 'B')"
+                " || setweight(to_tsvector('simple', %s), 'C'))"
+                " ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [product.pk, title, sku, category, description],
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [product.pk])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, sku, category, description)"
+                " VALUES (%s, %s, %s, %s, %s)",
+                [product.pk, title, sku, category, description],
+            )
+
+
+def remove_product(product_id):
+    if not is_supported():
+        return
+    column = "product_id" if connection.vendor == "postgresql" else "rowid"
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {column} = %s", [product_id])
+
+
+def rebuild_index(chunk_size=500):
+    from .models import Product
+
+    if not is_supported():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    count = 0
+    products = Product.objects.filter(is_active=True).select_related("category")
+    for product in products.iterator(chunk_size=chunk_size):
+        index_product(product)
+        count += 1
+    return count
+
+
+# -----------------------
+# QUERY
+# -----------------------
+def _tokens(query):
+    return _TOKEN_RE.findall(query.lower())[:10]
+
+
+def search_ranked(query, limit=MAX_RESULTS):
+    """
+    [(product_id, score)] for ``query``, best match first (score descending,
+    then id descending). Every term must match, the last one as a prefix so
+    partially typed words still hit. Returns None when the database has no
+    full-text index to use.
+    """
+    if not is_supported():
+        return None
+    tokens = _tokens(query)
+    if not tokens:
+        return []
+
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            tsquery = " & ".join(tokens[:-1] + [f"{tokens[-1]}:*"])
+            cursor.execute(
+                f"SELECT product_id, ts_rank(document, q) AS score FROM {SEARCH_TABLE}, to_tsquery('simple', %s) AS q"
+                " WHERE document @@ q"
+                " ORDER BY score DESC, product_id DESC LIMIT %s",
+                [tsquery, limit],
+            )
+        else:
+            # bm25() is lower-is-better; negate it so both backends rank high first
+            match = " ".join(f'"{t}"' for t in tokens[:-1]) + f' "{tokens[-1]}"*'
+            cursor.execute(
+                f"SELECT rowid, -bm25({SEARCH_TABLE}, 10.0, 10.0, 4.0, 1.0) AS score FROM {SEARCH_TABLE}"
+                f" WHERE {SEARCH_TABLE} MATCH %s ORDER BY score DESC, rowid DESC LIMIT %s",
+                [match.strip(), limit],
+            )
+        return [(pk, float(score)) for pk, score in cursor.fetchall()]
+
+
+def search_product_ids(query, limit=MAX_RESULTS):
+    """Ranked product ids for ``query`` (see search_ranked)."""
+    ranked = search_ranked(query, limit)
+    return None if ranked is None else [pk for pk, _ in ranked]
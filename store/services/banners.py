@@ -0,0 +1,60 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from ..caching import bump_version_on_commit, get_version
+from ..models import FeaturedBanner, HomeBanner
+
+
+BANNER_VERSION = "banners"
+ACTIVE_BANNERS_KEY = "banners:active:{}"
+
+
+def _live(banner, now):
+    return (banner.starts_at is None or banner.starts_at <= now) and (banner.ends_at is None or banner.ends_at > now)
+
+
+def _next_transition(banners, now):
+    upcoming = [
+        moment
+        for banner in banners
+        for moment in (banner.starts_at, banner.ends_at)
+        if moment is not None and moment > now
+    ]
+    return min(upcoming, default=None)
+
+
+def compute_active_banners(now=None):
+    """
+    The banners live at ``now`` and when that set next changes (a start or
+    end time still ahead), from one query per banner model.
+    """
+    now = now or timezone.now()
+    home = list(HomeBanner.objects.filter(is_active=True))
+    featured = list(FeaturedBanner.objects.filter(is_active=True))
+    return {
+        "banner": next((b for b in home if _live(b, now)), None),
+        "featured": [b for b in featured if _live(b, now)],
+        "expires_at": _next_transition(home + featured, now),
+    }
+
+
+def active_banners():
+    """
+    Cached until the next scheduled transition (or the next banner edit,
+    which bumps the version), so between swaps the home page never queries
+    the banner tables.
+    """
+    now = timezone.now()
+    key = ACTIVE_BANNERS_KEY.format(get_version(BANNER_VERSION))
+    active = cache.get(key)
+    if active is None or (active["expires_at"] and active["expires_at"] <= now):
+        active = compute_active_banners(now)
+        timeout = None
+        if active["expires_at"]:
+            timeout = max(1, int((active["expires_at"] - now).total_seconds()) + 1)
+        cache.set(key, active, timeout=timeout)
+    return active
+
+
+def invalidate_active_banners():
+    bump_version_on_commit(BANNER_VERSION)
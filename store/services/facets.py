@@ -0,0 +1,243 @@
+import threading
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from ..categories import path_ids
+from ..models import Category, FacetCount, Product, ProductFacet, ProductVariant
+
+
+# product ids with a facet refresh queued on this thread (schedule_facet_refresh)
+_local = threading.local()
+
+
+ALL_SCOPE = 0
+
+
+# -----------------------
+# PRICE BUCKETS
+# -----------------------
+def price_buckets():
+    return [(Decimal(str(low)), Decimal(str(high)) if high is not None else None)
+            for low, high in settings.CATALOG_PRICE_BUCKETS]
+
+
+def bucket_label(low, high):
+    if high is None:
+        return f"{low:.0f}+"
+    return f"{low:.0f}-{high:.0f}"
+
+
+def price_bucket(price):
+    for low, high in price_buckets():
+        if price >= low and (high is None or price < high):
+            return bucket_label(low, high)
+    return ""
+
+
+# -----------------------
+# FACET VALUES
+# -----------------------
+def facet_values(product, variants):
+    """
+    The (facet, value) pairs a product is counted under. ``variants`` are the
+    product's ProductVariant rows; variant-less products fall back to the
+    comma separated colors/sizes on Product and are treated as in stock.
+    """
+    if not product.is_active:
+        return set()
+
+    values = set()
+    active = [v for v in variants if v.is_active]
+    if active:
+        values.update(("color", v.color.strip()) for v in active if v.color.strip())
+        values.update(("size", v.size.strip()) for v in active if v.size.strip())
+        in_stock = any(v.stock_qty > 0 for v in active)
+    else:
+        values.update(("color", c) for c in product.color_list())
+        values.update(("size", s) for s in product.size_list())
+        in_stock = True
+
+    values.add(("stock", "in" if in_stock else "out"))
+    bucket = price_bucket(product.price)
+    if bucket:
+        values.add(("price", bucket))
+    return {(facet, value[:60]) for facet, value in values}
+
+
+def _scopes(category_id, path):
+    # a product counts towards the whole catalog, its category and every ancestor
+    return (ALL_SCOPE, *(path_ids(path) or [category_id]))
+
+
+def _scope_map(category_ids):
+    paths = dict(Category.objects.filter(id__in=set(category_ids)).values_list("id", "path"))
+    return {cid: _scopes(cid, paths.get(cid, "")) for cid in category_ids}
+
+
+def _bump(scope, facet, value, delta):
+    updated = FacetCount.objects.filter(scope=scope, facet=facet, value=value).update(count=F("count") + delta)
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            FacetCount.objects.create(scope=scope, facet=facet, value=value, count=delta)
+    except IntegrityError:
+        FacetCount.objects.filter(scope=scope, facet=facet, value=value).update(count=F("count") + delta)
+
+
+# -----------------------
+# INCREMENTAL MAINTENANCE
+# -----------------------
+def refresh_product_facets(product_id):
+    """
+    Recompute one product's facet rows and apply only the difference to the
+    precomputed FacetCount table.
+    """
+    with transaction.atomic():
+        product = Product.objects.filter(id=product_id).first()
+        existing = {(f.scope, f.facet, f.value): f.id for f in ProductFacet.objects.filter(product_id=product_id)}
+
+        wanted = set()
+        if product:
+            variants = ProductVariant.objects.filter(product_id=product_id)
+            wanted = {(product.category_id, facet, value) for facet, value in facet_values(product, variants)}
+
+        removed = set(existing) - wanted
+        added = wanted - set(existing)
+        if not removed and not added:
+            return
+
+        if removed:
+            ProductFacet.objects.filter(id__in=[existing[key] for key in removed]).delete()
+        ProductFacet.objects.bulk_create([
+            ProductFacet(product_id=product_id, scope=scope, facet=facet, value=value)
+            for scope, facet, value in added
+        ])
+
+        scopes = _scope_map([scope for scope, _, _ in removed | added])
+        for scope, facet, value in removed:
+            for target in scopes[scope]:
+                _bump(target, facet, value, -1)
+        for scope, facet, value in added:
+            for target in scopes[scope]:
+                _bump(target, facet, value, 1)
+
+
+def clear_product_facets(product_id):
+    with transaction.atomic():
+        rows = list(ProductFacet.objects.filter(product_id=product_id))
+        scopes = _scope_map([row.scope for row in rows])
+        for row in rows:
+            for target in scopes[row.scope]:
+                _bump(target, row.facet, row.value, -1)
+        ProductFacet.objects.filter(product_id=product_id).delete()
+
+
+def move_category_facets(category, old_path):
+    """
+    A re-parented category takes its subtree's counts from the ancestors it
+    left to the ones it joined. Scopes inside the subtree, ancestors shared
+    by both paths and the whole-catalog scope keep their counts.
+    """
+    old_ancestors = set(path_ids(old_path)) - {category.id}
+    new_ancestors = set(path_ids(category.path)) - {category.id}
+    left, joined = old_ancestors - new_ancestors, new_ancestors - old_ancestors
+    if not left and not joined:
+        return
+
+    subtree = Category.objects.filter(path__startswith=category.path).values("id")
+    totals = (
+        ProductFacet.objects.filter(scope__in=subtree)
+        .values_list("facet", "value")
+        .annotate(n=Count("id"))
+    )
+    with transaction.atomic():
+        for facet, value, n in totals:
+            for scope in left:
+                _bump(scope, facet, value, -n)
+            for scope in joined:
+                _bump(scope, facet, value, n)
+
+
+def _pending():
+    if not hasattr(_local, "pending"):
+        _local.pending = set()
+    return _local.pending
+
+
+def schedule_facet_refresh(product_id):
+    """
+    Refresh once per product after the surrounding transaction commits, so an
+    admin save touching many variant rows only recomputes the product once:
+    every call queues a callback, the first one to run takes the id out of
+    this thread's pending set and the rest find it gone. Ids left behind by a
+    rolled-back transaction only mean the next commit refreshes them.
+    """
+    _pending().add(product_id)
+
+    def _run():
+        pending = _pending()
+        if product_id not in pending:
+            return
+        pending.discard(product_id)
+        refresh_product_facets(product_id)
+
+    transaction.on_commit(_run)
+
+
+def rebuild_facets(chunk_size=500):
+    with transaction.atomic():
+        ProductFacet.objects.all().delete()
+        FacetCount.objects.all().delete()
+
+        paths = dict(Category.objects.values_list("id", "path"))
+        counts = {}
+        rows = []
+        products = Product.objects.prefetch_related("variants").order_by("id")
+        for product in products.iterator(chunk_size=chunk_size):
+            for facet, value in facet_values(product, product.variants.all()):
+                rows.append(ProductFacet(product_id=product.id, scope=product.category_id, facet=facet, value=value))
+                for target in _scopes(product.category_id, paths.get(product.category_id, "")):
+                    counts[(target, facet, value)] = counts.get((target, facet, value), 0) + 1
+            if len(rows) >= chunk_size:
+                ProductFacet.objects.bulk_create(rows)
+                rows = []
+        ProductFacet.objects.bulk_create(rows)
+
+        FacetCount.objects.bulk_create([
+            FacetCount(scope=scope, facet=facet, value=value, count=count)
+            for (scope, facet, value), count in counts.items()
+        ], batch_size=chunk_size)
+    return len(counts)
+
+
+# -----------------------
+# STOREFRONT
+# -----------------------
+def filter_by_facets(products, selected):
+    """
+    Narrow a Product queryset by the selected facet values. Values inside a
+    facet are OR'ed, different facets are AND'ed.
+    """
+    for facet, values in selected.items():
+        if values:
+            products = products.filter(
+                id__in=ProductFacet.objects.filter(facet=facet, value__in=values).values("product_id")
+            )
+    return products
+
+
+def facet_counts(scope=ALL_SCOPE):
+    order = {value: i for i, value in enumerate(bucket_label(low, high) for low, high in price_buckets())}
+    grouped = {facet: [] for facet, _ in ProductFacet._meta.get_field("facet").choices}
+    rows = FacetCount.objects.filter(scope=scope, count__gt=0).values_list("facet", "value", "count")
+    for facet, value, count in rows:
+        grouped.setdefault(facet, []).append({"value": value, "count": count})
+
+    grouped["price"].sort(key=lambda row: order.get(row["value"], len(order)))
+    for facet in ("color", "size"):
+        grouped[facet].sort(key=lambda row: row["value"].lower())
+    return grouped
@@ -0,0 +1,164 @@
+import csv
+import io
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.urls import reverse
+from django.utils.html import strip_tags
+
+from ..caching import bump_version, bump_version_on_commit
+from ..models import Product, ProductFeedItem, SiteSettings
+
+
+FEED_VERSION = "feed"
+
+FEED_COLUMNS = (
+    "id", "item_group_id", "title", "description", "availability", "condition", "price",
+    "link", "image_link", "additional_image_link", "brand", "product_type", "color", "size",
+)
+
+
+# -----------------------
+# RENDERING (one product -> its feed rows)
+# -----------------------
+def _absolute(url):
+    return urljoin(settings.FEED_BASE_URL + "/", url) if url else ""
+
+
+def feed_items(product, brand):
+    """One feed item per active variant (grouped by product), or one per product."""
+    images = [_absolute(img.image.url) for img in product.images.all() if img.image]
+    common = {
+        "title": product.title[:150],
+        "description": (strip_tags(product.description) or product.title)[:5000],
+        "condition": "new",
+        "price": f"{product.price:.2f} {settings.FEED_CURRENCY}",
+        "link": _absolute(reverse("store:product_detail", args=[product.slug])),
+        "image_link": images[0] if images else "",
+        "additional_image_link": ",".join(images[1:11]),
+        "brand": brand,
+        "product_type": product.category.name,
+    }
+
+    variants = [v for v in product.variants.all() if v.is_active]
+    if not variants:
+        return [{
+            **common,
+            "id": product.sku or str(product.id),
+            "availability": "in stock" if product.in_stock else "out of stock",
+        }]
+
+    group = product.sku or str(product.id)
+    return [{
+        **common,
+        "id": variant.sku or f"{product.id}-{variant.id}",
+        "item_group_id": group,
+        "availability": "in stock" if variant.stock_qty > 0 else "out of stock",
+        "color": variant.color,
+        "size": variant.size,
+    } for variant in variants]
+
+
+def render_csv(items):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for item in items:
+        writer.writerow([item.get(column, "") for column in FEED_COLUMNS])
+    return buffer.getvalue()
+
+
+def render_xml(items):
+    return "".join(
+        "<item>" + "".join(
+            f"<g:{column}>{escape(str(item[column]))}</g:{column}>"
+            for column in FEED_COLUMNS if item.get(column)
+        ) + "</item>\n"
+        for item in items
+    )
+
+
+# -----------------------
+# INCREMENTAL REGENERATION
+# -----------------------
+def _flush(batch):
+    ProductFeedItem.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["csv_rows", "xml_items", "source_updated_at", "generated_at"],
+    )
+
+
+def refresh_feed(full=False, chunk_size=500):
+    """
+    Re-render only products changed since their feed rows were written
+    (Product.updated_at also moves on image/variant edits) and drop rows of
+    deactivated products. ``full`` re-renders everything, e.g. after a brand
+    or currency change. Returns (rendered, removed).
+    """
+    removed, _ = ProductFeedItem.objects.filter(product__is_active=False).delete()
+
+    products = Product.objects.filter(is_active=True)
+    if not full:
+        products = products.filter(
+            Q(feed_item__isnull=True) | Q(feed_item__source_updated_at__lt=F("updated_at"))
+        )
+    products = products.select_related("category").prefetch_related("images", "variants").order_by("id")
+
+    site = SiteSettings.objects.first()
+    brand = site.brand_name if site else ""
+
+    rendered = 0
+    batch = []
+    for product in products.iterator(chunk_size=chunk_size):
+        items = feed_items(product, brand)
+        batch.append(ProductFeedItem(
+            product=product,
+            csv_rows=render_csv(items),
+            xml_items=render_xml(items),
+            source_updated_at=product.updated_at,
+        ))
+        if len(batch) >= chunk_size:
+            _flush(batch)
+            rendered += len(batch)
+            batch = []
+    if batch:
+        _flush(batch)
+        rendered += len(batch)
+
+    if rendered or removed:
+        bump_version(FEED_VERSION)
+    return rendered, removed
+
+
+def invalidate_feed():
+    # a hard-deleted product takes its ProductFeedItem with it (cascade)
+    bump_version_on_commit(FEED_VERSION)
+
+
+# -----------------------
+# STREAMING
+# -----------------------
+def stream_feed(fmt, chunk_size=500):
+    """Yield the whole feed in ``fmt`` ("csv" or "xml") from the stored rows."""
+    column = "csv_rows" if fmt == "csv" else "xml_items"
+    rows = ProductFeedItem.objects.order_by("product_id").values_list(column, flat=True)
+
+    if fmt == "csv":
+        yield render_csv([dict(zip(FEED_COLUMNS, FEED_COLUMNS))])
+    else:
+        site = SiteSettings.objects.first()
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<rss version="2.0" xmlns:g="http://base.google.com/ns/1.0"><channel>\n'
+            f"<title>{escape(site.brand_name if site else '')}</title>"
+            f"<link>{escape(settings.FEED_BASE_URL)}</link><description>Product feed</description>\n"
+        )
+
+    for text in rows.iterator(chunk_size=chunk_size):
+        yield text
+
+    if fmt == "xml":
+        yield "</channel></rss>\n"
@@ -0,0 +1,164 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from ..caching import CATALOG_VERSION, STOCK_VERSION, bump_product_version_on_commit, bump_version_on_commit
+from ..cdn import purge_on_commit
+from ..models import Product, ProductVariant
+from . import facets
+
+
+SNAPSHOT_FIELDS = ("has_variants", "total_stock", "in_stock", "available_colors", "available_sizes")
+# what listings, facets and cards show; a bare stock count change is not
+LISTED_FIELDS = ("has_variants", "in_stock", "available_colors", "available_sizes")
+
+
+def _split(value):
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def _join(values):
+    seen = []
+    for value in values:
+        value = value.strip()
+        if value and value not in seen:
+            seen.append(value)
+    return ", ".join(seen)[:255]
+
+
+def stock_snapshot(colors, sizes, variants):
+    """
+    Denormalized availability for one product. ``colors``/``sizes`` are the
+    product's comma separated lists, ``variants`` its active variants as
+    (color, size, stock_qty). Variant-less products are always in stock.
+    """
+    variants = list(variants)
+    if not variants:
+        return {
+            "has_variants": False,
+            "total_stock": 0,
+            "in_stock": True,
+            "available_colors": _join(_split(colors)),
+            "available_sizes": _join(_split(sizes)),
+        }
+
+    stocked = [(color, size) for color, size, qty in variants if qty > 0]
+    return {
+        "has_variants": True,
+        "total_stock": sum(qty for _, _, qty in variants),
+        "in_stock": bool(stocked),
+        "available_colors": _join(color for color, _ in stocked),
+        "available_sizes": _join(size for _, size in stocked),
+    }
+
+
+def lock_product(product_id):
+    """
+    Take the product row lock before touching its variants, so checkouts and
+    admin edits of the same product serialize in one order (product, then
+    variants) and the snapshot is computed from committed stock.
+    """
+    if transaction.get_connection().in_atomic_block:
+        list(Product.objects.select_for_update().filter(pk=product_id).values_list("pk", flat=True))
+
+
+def _variants(product_id):
+    return ProductVariant.objects.filter(
+        product_id=product_id, is_active=True
+    ).order_by("id").values_list("color", "size", "stock_qty")
+
+
+def refresh_product_stock(product_id):
+    product = Product.objects.filter(pk=product_id).only("colors", "sizes", *SNAPSHOT_FIELDS).first()
+    if not product:
+        return {}
+
+    snapshot = stock_snapshot(product.colors, product.sizes, _variants(product_id))
+    changed = {field: value for field, value in snapshot.items() if getattr(product, field) != value}
+    if changed:
+        Product.objects.filter(pk=product_id).update(**changed)
+    if any(field in changed for field in LISTED_FIELDS):
+        bump_version_on_commit(CATALOG_VERSION)
+    return changed
+
+
+def stock_changed(product_ids):
+    """
+    What a variant save sets off (store.signals), once per product, for stock
+    written with queryset updates such as the checkout decrement: snapshot,
+    facets, updated_at (detail ETag, feed), product caches, CDN keys and
+    STOCK_VERSION. Call inside the transaction that wrote the stock.
+    """
+    product_ids = sorted(set(product_ids))
+    if not product_ids:
+        return
+    Product.objects.filter(pk__in=product_ids).update(updated_at=timezone.now())
+    for product_id in product_ids:
+        refresh_product_stock(product_id)
+        facets.schedule_facet_refresh(product_id)
+        bump_product_version_on_commit(product_id)
+    purge_on_commit(*(f"product-{product_id}" for product_id in product_ids))
+    bump_version_on_commit(STOCK_VERSION)
+
+
+def reconcile_stock(fix=False, chunk_size=500):
+    """
+    Compare every product's snapshot with its variants. Returns
+    ``[(product_id, {field: (stored, actual)})]`` and repairs them when ``fix``.
+    """
+    drift = []
+    products = Product.objects.only("colors", "sizes", *SNAPSHOT_FIELDS).prefetch_related("variants").order_by("id")
+    for product in products.iterator(chunk_size=chunk_size):
+        variants = sorted((v for v in product.variants.all() if v.is_active), key=lambda v: v.id)
+        snapshot = stock_snapshot(product.colors, product.sizes, [(v.color, v.size, v.stock_qty) for v in variants])
+        diff = {
+            field: (getattr(product, field), value)
+            for field, value in snapshot.items()
+            if getattr(product, field) != value
+        }
+        if diff:
+            drift.append((product.id, diff))
+            if fix:
+                Product.objects.filter(pk=product.id).update(**{field: actual for field, (_, actual) in diff.items()})
+    if fix and drift:
+        bump_version_on_commit(CATALOG_VERSION)
+    return drift
+
+
+# -----------------------
+# AVAILABILITY MATRIX
+# -----------------------
+MATRIX_KEY = "product:{}:matrix:{}"
+
+
+def build_matrix(variants):
+    """
+    ``variants`` as (color, size, stock_qty) -> {"colors": [...], "sizes":
+    [...], "stock": [[qty or None per size] per color]}. None marks a
+    combination that does not exist, 0 one that is sold out.
+    """
+    colors, sizes, stock = [], [], {}
+    for color, size, qty in variants:
+        if color not in colors:
+            colors.append(color)
+        if size not in sizes:
+            sizes.append(size)
+        stock[(color, size)] = qty
+    return {
+        "colors": colors,
+        "sizes": sizes,
+        "stock": [[stock.get((color, size)) for size in sizes] for color in colors],
+    }
+
+
+def availability_matrix(product):
+    """
+    One query per product version: variant saves and the checkout decrement
+    (stock_changed) bump Product.cache_version, which retires the cached matrix.
+    """
+    key = MATRIX_KEY.format(product.id, product.cache_version)
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_matrix(_variants(product.id))
+        cache.set(key, matrix, timeout=86400)
+    return matrix
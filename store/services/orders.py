@@ -1,7 +1,12 @@
 from django.db import transaction
-from django.db.models import F
+from django.db.models import F, Sum
 
-from ..models import Order, OrderItem, PaymentTransaction, ProductVariant, Coupon
+from ..models import Order, OrderItem, PaymentTransaction, Product, ProductVariant, Coupon
+from .inventory import stock_changed
+
+
+# orders that no longer count as sales (same rule as co-purchase baskets)
+SALES_EXCLUDED_STATUSES = ("cancelled", "refunded")
 
 
 def _lock_and_validate_stock(items):
@@ -9,12 +14,18 @@ def _lock_and_validate_stock(items):
     for it in items:
         product = it["product"]
         qty = it["qty"]
+        variant = it.get("variant")
+        if variant is not None:
+            # hydrated with the cart; re-checked against the locked row below
+            variant_keys.append((variant.id, qty))
+            continue
+
         color = (it.get("color") or "").strip()
         size = (it.get("size") or "").strip()
 
-        variant_qs = ProductVariant.objects.filter(product=product, is_active=True)
-        if not variant_qs.exists():
+        if not product.has_variants:
             continue
+        variant_qs = ProductVariant.objects.filter(product=product, is_active=True)
 
         if not color or not size:
             raise ValueError("Please select a valid color & size.")
@@ -36,6 +47,11 @@ def create_order_from_cart(*, items, subtotal, discount, shipping_cost, total, c
                            full_name, phone, email, address, city, area, postal_code,
                            payment_method, payment_reference, payment_proof, notes):
     with transaction.atomic():
+        # product rows first, in id order: the same lock order the variant
+        # signals use, so concurrent checkouts cannot deadlock
+        product_ids = sorted({it["product"].id for it in items})
+        list(Product.objects.select_for_update().filter(id__in=product_ids).order_by("id").values_list("id", flat=True))
+
         variant_keys = _lock_and_validate_stock(items)
 
         if variant_keys:
@@ -47,8 +63,11 @@ def create_order_from_cart(*, items, subtotal, discount, shipping_cost, total, c
                     raise ValueError("Please select a valid color & size.")
                 if qty > variant.stock_qty:
                     raise ValueError(f"Only {variant.stock_qty} left in stock.")
-                variant.stock_qty = max(0, variant.stock_qty - qty)
-                variant.save(update_fields=["stock_qty"])
+                # the row is locked and checked: no save(), so the variant
+                # signals (meant for admin edits) do not run once per line
+                ProductVariant.objects.filter(pk=vid).update(stock_qty=F("stock_qty") - qty)
+                variant.stock_qty -= qty
+            stock_changed(v.product_id for v in locked.values())
 
         order = Order.objects.create(
             full_name=full_name,
@@ -82,6 +101,12 @@ def create_order_from_cart(*, items, subtotal, discount, shipping_cost, total, c
                 size=it.get("size") or "",
             )
 
+        sold = {}
+        for it in items:
+            sold[it["product"].id] = sold.get(it["product"].id, 0) + it["qty"]
+        for product_id, qty in sold.items():
+            Product.objects.filter(id=product_id).update(sales_count=F("sales_count") + qty)
+
         PaymentTransaction.objects.create(
             order=order,
             method=payment_method,
@@ -94,3 +119,22 @@ def create_order_from_cart(*, items, subtotal, discount, shipping_cost, total, c
             Coupon.objects.filter(id=coupon_obj.id).update(used_count=F("used_count") + 1)
 
         return order
+
+
+def recount_sales(chunk_size=500):
+    """
+    Recompute Product.sales_count from OrderItem, dropping units from orders
+    cancelled or refunded since checkout. Returns the number of products fixed.
+    """
+    sold = dict(
+        OrderItem.objects.exclude(order__status__in=SALES_EXCLUDED_STATUSES)
+        .values("product_id").annotate(total=Sum("qty")).values_list("product_id", "total")
+    )
+    fixed = 0
+    products = Product.objects.only("sales_count").order_by("id")
+    for product in products.iterator(chunk_size=chunk_size):
+        actual = sold.get(product.id) or 0
+        if product.sales_count != actual:
+            Product.objects.filter(pk=product.pk).update(sales_count=actual)
+            fixed += 1
+    return fixed
@@ -0,0 +1,100 @@
+import heapq
+import math
+from collections import Counter
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+
+from ..caching import bump_version_on_commit
+from ..models import OrderItem, Product, ProductRelation
+
+
+EXCLUDED_STATUSES = ("cancelled", "refunded")
+
+RELATED_VERSION = "related"    # bumped by every rebuild of the relation table
+
+
+# -----------------------
+# OFFLINE BUILD
+# -----------------------
+def _baskets(chunk_size):
+    """Distinct product ids per order, streamed in order id order."""
+    rows = (
+        OrderItem.objects.exclude(order__status__in=EXCLUDED_STATUSES)
+        .order_by("order_id")
+        .values_list("order_id", "product_id")
+    )
+    current, basket = None, set()
+    for order_id, product_id in rows.iterator(chunk_size=chunk_size):
+        if order_id != current:
+            if basket:
+                yield basket
+            current, basket = order_id, set()
+        basket.add(product_id)
+    if basket:
+        yield basket
+
+
+def co_purchase_neighbours(chunk_size=5000, max_basket=None):
+    """
+    One pass over OrderItem building sparse co-occurrence counts. Returns
+    ``{product_id: [(score, together, other_id), ...]}`` where score is the
+    cosine similarity of the two products' order sets.
+    """
+    max_basket = max_basket or settings.RELATED_PRODUCTS_MAX_BASKET
+    orders = Counter()
+    pairs = Counter()
+    for basket in _baskets(chunk_size):
+        if len(basket) > max_basket:
+            # bulk orders would relate everything to everything
+            continue
+        orders.update(basket)
+        if len(basket) > 1:
+            pairs.update(combinations(sorted(basket), 2))
+
+    neighbours = {}
+    for (a, b), together in pairs.items():
+        # relative to how often each sells, so a best seller is not
+        # "related" to every product in the shop
+        score = together / math.sqrt(orders[a] * orders[b])
+        neighbours.setdefault(a, []).append((score, together, b))
+        neighbours.setdefault(b, []).append((score, together, a))
+    return neighbours
+
+
+def rebuild_related_products(top_n=None, chunk_size=5000):
+    top_n = top_n or settings.RELATED_PRODUCTS_TOP_N
+    neighbours = co_purchase_neighbours(chunk_size=chunk_size)
+
+    rows = []
+    for product_id, candidates in neighbours.items():
+        for rank, (score, _, related_id) in enumerate(heapq.nlargest(top_n, candidates)):
+            rows.append(ProductRelation(product_id=product_id, related_id=related_id, rank=rank, score=score))
+
+    with transaction.atomic():
+        ProductRelation.objects.all().delete()
+        ProductRelation.objects.bulk_create(rows, batch_size=1000)
+    bump_version_on_commit(RELATED_VERSION)
+    return len(neighbours)
+
+
+# -----------------------
+# STOREFRONT
+# -----------------------
+def related_products(product, limit=4):
+    """
+    Top co-purchased products, topped up with the newest products from the
+    same category while the relation table has nothing (new shop, new product).
+    """
+    related = list(
+        Product.objects.cards()
+        .filter(is_active=True, relation_targets__product=product)
+        .order_by("relation_targets__rank")[:limit]
+    )
+    if len(related) < limit:
+        related += Product.objects.cards().filter(
+            is_active=True,
+            category=product.category_id,
+        ).exclude(id__in=[product.id, *(p.id for p in related)]).order_by("-created_at")[:limit - len(related)]
+    return related
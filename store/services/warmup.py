@@ -0,0 +1,64 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+
+from ..categories import category_tree
+from ..models import Product
+
+
+logger = logging.getLogger(__name__)
+
+def _host():
+    return next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+
+def warm_urls(products=None):
+    """Home, the full listing, every active category and product detail page."""
+    urls = [reverse("store:home"), reverse("store:product_list")]
+    listing = reverse("store:product_list")
+    urls += [f"{listing}?cat={c.slug}" for c in category_tree().by_id.values() if c.is_active]
+
+    slugs = Product.objects.filter(is_active=True).order_by("-sales_count", "-id").values_list("slug", flat=True)
+    if products is not None:
+        slugs = slugs[:products]
+    urls += [reverse("store:product_detail", args=[slug]) for slug in slugs]
+    return urls
+
+
+def _fetch(url):
+    # an anonymous visitor with no cookies, so shared page/fragment caches fill
+    client = Client(SERVER_NAME=_host(), raise_request_exception=False)
+    started = time.perf_counter()
+    try:
+        status = client.get(url, secure=True).status_code
+    finally:
+        connections.close_all()
+    return url, status, time.perf_counter() - started
+
+
+def warm_cache(urls=None, concurrency=4):
+    """
+    Render ``urls`` (default: warm_urls()) through the full request stack with
+    at most ``concurrency`` requests in flight. Returns [(url, status, seconds)].
+    """
+    urls = warm_urls() if urls is None else urls
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(_fetch, urls))
+
+
+def warm_and_log(products, concurrency):
+    try:
+        results = warm_cache(warm_urls(products), concurrency=concurrency)
+    except Exception:
+        # a cold cache is slow, not broken: never take the worker down
+        logger.exception("Cache warm-up failed")
+        return []
+    failed = sum(1 for _, status, _ in results if status >= 400)
+    logger.info("Warmed %s pages (%s failed)", len(results), failed)
+    return results
+
@@ -0,0 +1,341 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import search, suggest
+from .cdn import HOME_KEY, PRODUCTS_KEY, SITE_KEY, purge_on_commit
+from .categories import invalidate_category_tree
+from .images import delete_derivatives, schedule_derivatives
+from .caching import (
+    CATALOG_VERSION,
+    SITE_VERSION,
+    STOCK_VERSION,
+    bump_page_version_on_commit,
+    bump_product_version_on_commit,
+    bump_version_on_commit,
+)
+from .models import (
+    Category,
+    FeaturedBanner,
+    HomeBanner,
+    NavLink,
+    Product,
+    ProductImage,
+    ProductVariant,
+    SiteSettings,
+)
+from .services import facets, feed, inventory
+from .services.banners import invalidate_active_banners
+
+
+# -----------------------
+# SEARCH INDEX
+# -----------------------
+@receiver(post_save, sender=Product)
+def _index_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_product(instance)
+
+
+@receiver(post_delete, sender=Product)
+def _unindex_product(sender, instance, **kwargs):
+    search.remove_product(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def _reindex_category_products(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    for product in instance.products.select_related("category").iterator():
+        search.index_product(product)
+
+
+# -----------------------
+# FACETS
+# -----------------------
+@receiver(post_save, sender=Product)
+def _refresh_product_facets(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    facets.schedule_facet_refresh(instance.pk)
+
+
+@receiver(pre_delete, sender=Product)
+def _clear_product_facets(sender, instance, **kwargs):
+    facets.clear_product_facets(instance.pk)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _refresh_variant_facets(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    facets.schedule_facet_refresh(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+def _recount_moved_category(sender, instance, raw=False, **kwargs):
+    # counts roll up to every ancestor scope; a re-parented subtree changes those
+    if raw or not getattr(instance, "_moved", False):
+        return
+    facets.move_category_facets(instance, instance._previous_path)
+
+
+# -----------------------
+# STOCK SNAPSHOT
+# -----------------------
+@receiver(pre_save, sender=ProductVariant)
+@receiver(pre_delete, sender=ProductVariant)
+def _lock_variant_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    inventory.lock_product(instance.product_id)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _refresh_variant_stock(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    inventory.refresh_product_stock(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def _refresh_product_stock(sender, instance, raw=False, **kwargs):
+    # variant-less products take colors/sizes from the product itself
+    if raw:
+        return
+    inventory.refresh_product_stock(instance.pk)
+
+
+# -----------------------
+# PRODUCT FEED
+# -----------------------
+@receiver(post_delete, sender=Product)
+def _invalidate_feed(sender, **kwargs):
+    feed.invalidate_feed()
+
+
+# -----------------------
+# SUGGESTION INDEX
+# -----------------------
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=Category)
+def _store_previous_suggest_fields(sender, instance, raw=False, **kwargs):
+    instance._previous_suggest = None
+    if instance.pk and not raw:
+        fields = suggest.INDEXED_FIELDS[sender._meta.model_name]
+        instance._previous_suggest = sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Category)
+def _invalidate_suggestions(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    fields = suggest.INDEXED_FIELDS[sender._meta.model_name]
+    if tuple(getattr(instance, field) for field in fields) != getattr(instance, "_previous_suggest", None):
+        suggest.invalidate_suggestions()
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Category)
+def _drop_suggestions(sender, **kwargs):
+    suggest.invalidate_suggestions()
+
+
+# -----------------------
+# CATEGORY TREE
+# -----------------------
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def _invalidate_category_tree(sender, **kwargs):
+    invalidate_category_tree()
+
+
+# -----------------------
+# IMAGE DERIVATIVES
+# -----------------------
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=ProductImage)
+@receiver(pre_save, sender=HomeBanner)
+@receiver(pre_save, sender=FeaturedBanner)
+def _store_previous_image(sender, instance, **kwargs):
+    instance._previous_image, instance._previous_derivatives = "", []
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values_list("image", "image_derivatives").first()
+        if previous:
+            instance._previous_image, instance._previous_derivatives = previous[0] or "", previous[1] or []
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_save, sender=HomeBanner)
+@receiver(post_save, sender=FeaturedBanner)
+def _schedule_image_derivatives(sender, instance, raw=False, **kwargs):
+    current = instance.image.name if instance.image else ""
+    if raw or current == getattr(instance, "_previous_image", ""):
+        return
+    if instance.image_derivatives:
+        # the old widths describe the old file
+        instance.image_derivatives = []
+        sender.objects.filter(pk=instance.pk).update(image_derivatives=[])
+    previous, widths = getattr(instance, "_previous_image", ""), getattr(instance, "_previous_derivatives", [])
+    if previous and widths:
+        storage = instance.image.storage
+        transaction.on_commit(lambda: delete_derivatives(storage, previous, widths))
+    if current:
+        schedule_derivatives(instance)
+
+
+# -----------------------
+# FRAGMENT CACHE VERSIONS
+# -----------------------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def _bump_product_version(sender, instance, **kwargs):
+    bump_product_version_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _bump_parent_product_version(sender, instance, **kwargs):
+    bump_product_version_on_commit(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+def _bump_category_product_versions(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    for product_id in instance.products.values_list("id", flat=True):
+        bump_product_version_on_commit(product_id)
+
+
+# -----------------------
+# CONDITIONAL GET (Product.updated_at + named versions)
+# -----------------------
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _touch_parent_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def _touch_category_products(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    instance.products.update(updated_at=timezone.now())
+
+
+# variant saves (and the checkout decrement, inventory.stock_changed) only bump STOCK_VERSION;
+# the stock snapshot bumps CATALOG_VERSION when listed availability changes
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def _bump_catalog_version(sender, **kwargs):
+    bump_version_on_commit(CATALOG_VERSION)
+
+
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _bump_stock_version(sender, **kwargs):
+    bump_version_on_commit(STOCK_VERSION)
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_save, sender=NavLink)
+@receiver(post_delete, sender=NavLink)
+def _bump_site_version(sender, **kwargs):
+    bump_version_on_commit(SITE_VERSION)
+
+
+# -----------------------
+# ACTIVE BANNER SET
+# -----------------------
+@receiver(post_save, sender=HomeBanner)
+@receiver(post_delete, sender=HomeBanner)
+@receiver(post_save, sender=FeaturedBanner)
+@receiver(post_delete, sender=FeaturedBanner)
+def _invalidate_active_banners(sender, **kwargs):
+    invalidate_active_banners()
+
+
+# -----------------------
+# HOME PAGE CACHE
+# -----------------------
+@receiver(post_save, sender=HomeBanner)
+@receiver(post_delete, sender=HomeBanner)
+@receiver(post_save, sender=FeaturedBanner)
+@receiver(post_delete, sender=FeaturedBanner)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_save, sender=NavLink)
+@receiver(post_delete, sender=NavLink)
+def _purge_home_page(sender, **kwargs):
+    bump_page_version_on_commit("home")
+
+
+# -----------------------
+# CDN PURGE (surrogate keys, see store.cdn)
+# -----------------------
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def _purge_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    purge_on_commit(instance, PRODUCTS_KEY)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=ProductVariant)
+@receiver(post_delete, sender=ProductVariant)
+def _purge_parent_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    purge_on_commit(f"product-{instance.product_id}")
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def _purge_category(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # category names appear in the navigation of every page
+    purge_on_commit(instance, SITE_KEY)
+
+
+@receiver(post_save, sender=HomeBanner)
+@receiver(post_delete, sender=HomeBanner)
+@receiver(post_save, sender=FeaturedBanner)
+@receiver(post_delete, sender=FeaturedBanner)
+def _purge_banner(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    purge_on_commit(instance, HOME_KEY)
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_save, sender=NavLink)
+@receiver(post_delete, sender=NavLink)
+def _purge_site(sender, raw=False, **kwargs):
+    if raw:
+        return
+    purge_on_commit(SITE_KEY)
+
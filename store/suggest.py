@@ -0,0 +1,103 @@
+from bisect import bisect_left
+
+from django.urls import reverse
+
+from .caching import bump_version_on_commit, get_version
+from .categories import TREE_VERSION, category_tree
+
+
+SUGGEST_VERSION = "suggest"
+
+# what the index is built from; saves that leave these alone (stock, price,
+# copy) keep it
+INDEXED_FIELDS = {
+    "product": ("title", "sku", "slug", "is_active"),
+    "category": ("name", "slug", "is_active"),
+}
+
+_index = None
+
+
+def normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def _keys(text):
+    """'Navy Wool Suit' -> 'navy wool suit', 'wool suit', 'suit' (any word start matches)."""
+    words = normalize(text).split(" ")
+    return [" ".join(words[i:]) for i in range(len(words)) if words[i]]
+
+
+class SuggestionIndex:
+    """
+    Sorted prefix keys with a parallel list of suggestion ids, so a lookup is
+    one bisect plus a short forward scan. ``suggestions`` holds the JSON-ready
+    payloads; products sort ahead of categories with equal keys.
+    """
+
+    def __init__(self, products, categories):
+        self.suggestions = []
+        entries = []
+        for product_id, title, sku, slug in products:
+            sid = len(self.suggestions)
+            self.suggestions.append({
+                "type": "product",
+                "label": title,
+                "sku": sku,
+                "url": reverse("store:product_detail", args=[slug]),
+            })
+            entries.extend((key, sid) for key in _keys(title))
+            if sku:
+                entries.append((normalize(sku), sid))
+
+        for category in categories:
+            sid = len(self.suggestions)
+            self.suggestions.append({
+                "type": "category",
+                "label": category.name,
+                "url": f"{reverse('store:product_list')}?cat={category.slug}",
+            })
+            entries.extend((key, sid) for key in _keys(category.name))
+
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.ids = [sid for _, sid in entries]
+
+    def lookup(self, query, limit=8):
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found = []
+        seen = set()
+        i = bisect_left(self.keys, prefix)
+        while i < len(self.keys) and self.keys[i].startswith(prefix) and len(found) < limit:
+            sid = self.ids[i]
+            if sid not in seen:
+                seen.add(sid)
+                found.append(self.suggestions[sid])
+            i += 1
+        return found
+
+
+def suggestion_index():
+    """
+    The per-process index, rebuilt with two queries only when an indexed
+    product field or the category tree changes.
+    """
+    global _index
+    from .models import Product
+
+    version = (get_version(SUGGEST_VERSION), get_version(TREE_VERSION))
+    if _index is None or _index[0] != version:
+        products = Product.objects.filter(is_active=True).order_by("id").values_list("id", "title", "sku", "slug")
+        categories = [c for c in category_tree().by_id.values() if c.is_active]
+        _index = (version, SuggestionIndex(list(products), categories))
+    return _index[1]
+
+
+def invalidate_suggestions():
+    bump_version_on_commit(SUGGEST_VERSION)
+
+
+def suggest(query, limit=8):
+    return suggestion_index().lookup(query, limit)
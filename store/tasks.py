@@ -2,13 +2,20 @@ import logging
 from datetime import timedelta
 
 from celery import shared_task
+from django.conf import settings
 from django.utils import timezone
 
+from .cdn import purge
+from .images import process_image
 from .integrations.payments.bkash import BkashClient
 from .integrations.payments.nagad import NagadClient
 from .integrations.payments.bank import BankManualVerifier
 from .models import PaymentTransaction, PaymentProviderConfig, PaymentReconciliationReport
 from .services.payments import mark_payment_verified, refresh_access_token
+from .services.feed import refresh_feed
+from .services.orders import recount_sales
+from .services.related import rebuild_related_products
+from .services.warmup import warm_and_log
 from django.core.mail import mail_admins
 
 
@@ -102,3 +109,42 @@ def reconcile_payments():
 
     logger.info("Reconciled %s/%s pending payments", reconciled, count)
     return reconciled
+
+
+@shared_task
+def rebuild_related():
+    """Nightly: recompute co-purchase neighbours from OrderItem."""
+    count = rebuild_related_products()
+    logger.info("Rebuilt related products for %s products", count)
+    return count
+
+
+@shared_task
+def recount_sales_counts():
+    """Nightly: drop cancelled/refunded units from the best-selling counter."""
+    fixed = recount_sales()
+    logger.info("Recounted sales for %s products", fixed)
+    return fixed
+
+
+@shared_task
+def purge_cdn_keys(keys):
+    return purge(keys)
+
+
+@shared_task
+def generate_image_derivatives(label, pk):
+    return process_image(label, pk)
+
+
+@shared_task
+def refresh_product_feed(full=False):
+    rendered, removed = refresh_feed(full=full)
+    logger.info("Product feed: rendered %s, removed %s", rendered, removed)
+    return rendered
+
+
+@shared_task
+def warm_caches(products=None, concurrency=None):
+    """Queue after bulk imports so the first shoppers do not pay for cold renders."""
+    return len(warm_and_log(products, concurrency or settings.WARM_CACHE_CONCURRENCY))
@@ -0,0 +1,28 @@
+from django import template
+
+from .. import images
+
+
+register = template.Library()
+
+
+@register.filter
+def srcset(field_file, fmt="webp"):
+    return images.srcset(field_file, fmt)
+
+
+@register.inclusion_tag("store/includes/picture.html")
+def picture(field_file, alt="", css="", sizes="100vw", loading="lazy"):
+    """
+    <picture> with WebP and JPEG derivatives when they exist, falling back
+    to the original upload until the background job has produced them.
+    """
+    return {
+        "src": field_file.url if field_file else "",
+        "webp": images.srcset(field_file, "webp"),
+        "jpeg": images.srcset(field_file, "jpeg"),
+        "alt": alt,
+        "css": css,
+        "sizes": sizes,
+        "loading": loading,
+    }
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from store.models import Category, Product
+from store.services.orders import create_order_from_cart
+
+
+# everything create_order_from_cart needs besides the items
+ORDER_FIELDS = {
+    "subtotal": 0, "discount": 0, "shipping_cost": 0, "total": 0, "coupon_obj": None,
+    "full_name": "A", "phone": "1", "email": "", "address": "X", "city": "", "area": "", "postal_code": "",
+    "payment_method": "cod", "payment_reference": "", "payment_proof": None, "notes": "",
+}
+
+
+def make_category(name="Suits", **fields):
+    return Category.objects.create(name=name, **fields)
+
+
+def make_product(category=None, **fields):
+    """A product in ``category`` (a new "Suits" category when omitted)."""
+    fields = {"title": "Navy Suit", "price": "100.00", **fields}
+    return Product.objects.create(category=category or make_category(), **fields)
+
+
+def place_order(items, **fields):
+    return create_order_from_cart(items=items, **{**ORDER_FIELDS, **fields})
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class StoreTestCase(TestCase):
+    """Storefront tests over plain http, each starting from an empty cache."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
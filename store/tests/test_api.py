@@ -0,0 +1,50 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+
+from store.models import ProductVariant
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+@override_settings(CATALOG_PAGE_SIZE=2)
+class CatalogApiTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.suits = make_category()
+        self.products = [
+            make_product(category=self.suits, title=f"Suit {i}")
+            for i in range(3)
+        ]
+        make_product(category=self.suits, title="Hidden", price="1.00", is_active=False)
+        ProductVariant.objects.create(product=self.products[0], color="Navy", size="M", stock_qty=3)
+
+    def test_products_are_paginated_with_sparse_fields(self):
+        url = reverse("store:api_products")
+        first = self.client.get(url, {"fields": "id,title"}).json()
+        self.assertEqual(set(first["results"][0]), {"id", "title"})
+
+        second = self.client.get(first["next"]).json()
+        ids = [row["id"] for row in first["results"] + second["results"]]
+        self.assertCountEqual(ids, [p.id for p in self.products])
+        self.assertIsNone(second["next"])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse("store:api_products"), {"fields": "id,cost_price"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_revalidation(self):
+        url = reverse("store:api_categories")
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+    def test_detail_includes_variants(self):
+        data = self.client.get(reverse("store:api_product_detail", args=[self.products[0].slug])).json()
+        self.assertEqual(data["variants"][0]["size"], "M")
+        self.assertEqual(data["total_stock"], 3)
+
+    def test_export_streams_active_products(self):
+        response = self.client.get(reverse("store:api_export"), {"fields": "id"})
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], sorted(p.id for p in self.products))
@@ -0,0 +1,279 @@
+import os
+import unittest
+from decimal import Decimal
+
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.exceptions import ImproperlyConfigured
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from store.cart import (
+    CART_SESSION_ID,
+    CART_SUMMARY_ID,
+    cart_add_item,
+    cart_items_with_totals,
+    cart_remove_item,
+    cart_set_item,
+    cart_summary,
+    get_cart,
+)
+from store.cart_storage import RedisCartStorage, check_cart_storage
+from store.context_processors import cart_context
+from store.models import OrderItem, ProductImage, ProductVariant
+from store.tests.base import StoreTestCase, make_category, make_product
+
+class CartSummaryTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        category = make_category()
+        self.suit = make_product(category=category, title="Navy Suit", price="120.00")
+        self.tie = make_product(category=category, title="Tie", price="10.00")
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+
+    def test_mutators_keep_the_summary(self):
+        cart_add_item(self.request, self.suit.id, qty=2)
+        cart_add_item(self.request, self.tie.id)
+        summary = self.request.session[CART_SUMMARY_ID]
+        self.assertEqual((summary["count"], summary["total"]), (3, "250.00"))
+
+    def _next_request(self):
+        request = RequestFactory().get("/")
+        request.session = self.request.session
+        return request
+
+    def test_context_is_lazy_and_badge_needs_no_query(self):
+        cart_add_item(self.request, self.suit.id, qty=2)
+        with self.assertNumQueries(0):
+            context = cart_context(self._next_request())
+            self.assertEqual(str(context["cart_count"]), "2")
+
+    def test_total_follows_price_edits(self):
+        cart_add_item(self.request, self.suit.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suit.price = Decimal("100.00")
+            self.suit.save()
+        self.assertEqual(cart_context(self._next_request())["cart_total"], Decimal("100.00"))
+
+    def test_badge_count_reaches_page_context(self):
+        self.client.post(reverse("store:cart_add", args=[self.suit.id]), {"qty": 1})
+        response = self.client.get(reverse("store:product_list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cart_count"], 1)
+        self.assertRegex(response.content.decode(), r'id="cartCount" data-cart-count\s+class="[^"]*">1</span>')
+
+
+class RequestCartTests(TestCase):
+    def setUp(self):
+        category = make_category()
+        self.suit = make_product(category=category, title="Navy Suit", price="120.00")
+        self.tie = make_product(category=category, title="Tie", price="10.00")
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+        cart_add_item(self.request, self.suit.id)
+
+    def test_hydrates_once_per_request(self):
+        session = self.request.session
+        self.request = RequestFactory().get("/")
+        self.request.session = session
+        with self.assertNumQueries(1):
+            items, total = cart_items_with_totals(self.request)
+            self.assertIs(cart_items_with_totals(self.request)[0], items)
+            # the fresh badge total reuses the priced lines
+            self.assertEqual(cart_summary(self.request, fresh_prices=True), {"count": 1, "total": total})
+
+    def test_mutation_invalidates_the_memo(self):
+        cart_items_with_totals(self.request)
+        cart_set_item(self.request, f"p{self.suit.id}", 2)
+        cart_add_item(self.request, self.tie.id)
+        items, total = cart_items_with_totals(self.request)
+        self.assertEqual([it["qty"] for it in items], [2, 1])
+        self.assertEqual(total, Decimal("250.00"))
+
+
+class VariantLineTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        category = make_category()
+        self.suit = make_product(category=category, title="Navy Suit", price="120.00")
+        self.m = ProductVariant.objects.create(product=self.suit, color="Navy", size="M", stock_qty=5)
+        self.l = ProductVariant.objects.create(product=self.suit, color="Navy", size="L", stock_qty=1)
+        self.tie = make_product(category=category, title="Tie", price="10.00")
+
+    def _add(self, product, **data):
+        return self.client.post(reverse("store:cart_add", args=[product.id]), {"qty": 1, **data})
+
+    def test_sizes_of_one_product_are_separate_lines(self):
+        self._add(self.suit, color="Navy", size="M")
+        self._add(self.suit, color="Navy", size="L")
+        self._add(self.tie)
+        self.assertEqual(set(self.client.session[CART_SESSION_ID]), {f"v{self.m.id}", f"v{self.l.id}", f"p{self.tie.id}"})
+
+    def test_hydration_is_one_query_with_stock_warnings(self):
+        request = RequestFactory().get("/")
+        request.session = SessionStore()
+        request.session[CART_SESSION_ID] = {
+            f"v{self.m.id}": {"qty": 2},
+            f"v{self.l.id}": {"qty": 3},
+            f"p{self.tie.id}": {"qty": 1},
+            str(self.tie.id): {"qty": 1},    # legacy key
+        }
+        with self.assertNumQueries(1):
+            items, total = cart_items_with_totals(request)
+        lines = {it["key"]: it for it in items}
+        self.assertEqual(lines[f"v{self.m.id}"]["size"], "M")
+        self.assertEqual(lines[f"v{self.m.id}"]["warning"], "")
+        self.assertEqual(lines[f"v{self.l.id}"]["warning"], "Only 1 left in stock.")
+        self.assertEqual(lines[str(self.tie.id)]["product"], self.tie)
+        self.assertEqual(total, Decimal("620.00"))
+
+        # the page adds no per-line queries (images come with the hydration)
+        ProductImage.objects.create(product=self.suit, image="products/suit.jpg")
+        ProductImage.objects.create(product=self.tie, image="products/tie.jpg")
+        session = self.client.session
+        session[CART_SESSION_ID] = dict(request.session[CART_SESSION_ID])
+        session.save()
+        self.client.get(reverse("store:cart_detail"))    # warm the site-wide caches
+        # session, the hydration, and the site_settings context processor (4)
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("store:cart_detail"))
+        self.assertContains(response, "products/suit.jpg", count=2)
+
+    def test_checkout_locks_the_hydrated_variant(self):
+        self._add(self.suit, color="Navy", size="M")
+        self.client.post(reverse("store:cart_update", args=[f"v{self.m.id}"]), {"qty": 2})
+        self.client.post(reverse("store:checkout"), {
+            "full_name": "A", "phone": "1", "address": "X", "payment_method": "cod",
+        })
+        self.m.refresh_from_db()
+        self.assertEqual(self.m.stock_qty, 3)
+        self.assertEqual(OrderItem.objects.get().size, "M")
+
+
+class CartEndpointTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        category = make_category()
+        self.suit = make_product(category=category, title="Navy Suit", price="120.00")
+        self.m = ProductVariant.objects.create(product=self.suit, color="Navy", size="M", stock_qty=2)
+        self.key = f"v{self.m.id}"
+
+    def _add(self, qty=1, **headers):
+        return self.client.post(
+            reverse("store:cart_add", args=[self.suit.id]), {"qty": qty, "color": "Navy", "size": "M"}, **headers
+        )
+
+    def test_json_add_returns_line_and_badge(self):
+        response = self._add(HTTP_ACCEPT="application/json")
+        data = response.json()
+        self.assertEqual((data["ok"], data["count"], data["total"]), (True, 1, "120.00"))
+        self.assertEqual((data["line"]["key"], data["line"]["size"]), (self.key, "M"))
+        self.assertNotIn("_messages", self.client.session)
+
+        response = self._add(qty=5, HTTP_ACCEPT="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["message"], "Only 2 left in stock.")
+
+    def test_fragment_update_and_remove(self):
+        self._add()
+        url = reverse("store:cart_update", args=[self.key])
+        response = self.client.post(url, {"qty": 2}, HTTP_HX_REQUEST="true")
+        self.assertTemplateNotUsed(response, "store/cart_detail.html")
+        self.assertContains(response, f'id="line-{self.key}"')
+        self.assertContains(response, 'id="cartTotals" class="mt-4 space-y-2 text-sm" hx-swap-oob="true"')
+        self.assertContains(response, "PKR 240.00")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertEqual(response["X-Cart-Count"], "2")
+
+        response = self.client.post(reverse("store:cart_remove", args=[self.key]), HTTP_ACCEPT="application/json")
+        self.assertEqual(response.json()["line"], None)
+        self.assertEqual(response.json()["count"], 0)
+
+    def test_plain_posts_still_redirect(self):
+        response = self._add()
+        self.assertRedirects(response, reverse("store:cart_detail"), fetch_redirect_response=False)
+
+
+class SessionCartStorageTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+
+    def test_mutators_keep_the_session_format(self):
+        cart_add_item(self.request, 5, qty=1, color="Navy", size="M", variant_id=9)
+        cart_add_item(self.request, 5, qty=2, variant_id=9)
+        cart_add_item(self.request, 7, size="L")
+        cart_set_item(self.request, "p7", 3)
+        self.assertEqual(get_cart(self.request), {
+            "v9": {"qty": 3, "color": "Navy", "size": "M"},
+            "p7": {"qty": 3, "color": None, "size": "L"},
+        })
+
+        cart_set_item(self.request, "p7", 0)
+        cart_remove_item(self.request, "v9")
+        self.assertEqual(get_cart(self.request), {})
+
+    @override_settings(
+        CART_STORAGE="store.cart_storage.RedisCartStorage",
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    )
+    def test_redis_storage_needs_a_redis_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            check_cart_storage()
+
+
+def _redis_client():
+    try:
+        import redis
+        client = redis.Redis.from_url(os.getenv("CART_TEST_REDIS_URL", "redis://localhost:6379/15"))
+        client.ping()
+        return client
+    except Exception:
+        return None
+
+
+REDIS = _redis_client()
+
+
+@unittest.skipIf(REDIS is None, "no Redis server reachable")
+class RedisCartStorageTests(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.session = SessionStore()
+        self.storage = RedisCartStorage(self.request, client=REDIS)
+
+    def tearDown(self):
+        cart_id = self.request.session.get("cart_id")
+        if cart_id:
+            REDIS.delete(f"cart:{cart_id}", f"cart:{cart_id}:opts", f"cart:{cart_id}:summary")
+
+    def test_lines_are_hash_fields_with_ttl(self):
+        self.assertEqual(self.storage.load(), {})
+        self.assertNotIn("cart_id", self.request.session)
+
+        self.storage.add("5", 1, "Navy", "M")
+        self.storage.add("5", 2)
+        self.storage.set("7", 4)
+        self.assertEqual(self.storage.load(), {
+            "5": {"qty": 3, "color": "Navy", "size": "M"},
+            "7": {"qty": 4, "color": None, "size": None},
+        })
+        key = f"cart:{self.request.session['cart_id']}"
+        self.assertEqual(REDIS.hget(key, "5"), b"3")
+        self.assertGreater(REDIS.ttl(key), 0)
+
+        self.storage.remove("5")
+        self.storage.set_summary({"count": 4, "total": "40.00", "version": 1})
+        self.assertEqual(list(self.storage.load()), ["7"])
+        self.assertEqual(self.storage.get_summary()["count"], 4)
+
+        self.storage.replace({})
+        self.assertEqual(self.storage.load(), {})
+
+    def test_session_cart_moves_to_redis_on_first_read(self):
+        self.request.session[CART_SESSION_ID] = {"p5": {"qty": 2, "color": "Navy", "size": None}}
+        self.request.session[CART_SUMMARY_ID] = {"count": 2, "total": "20.00", "version": 1}
+        self.assertEqual(self.storage.load(), {"p5": {"qty": 2, "color": "Navy", "size": None}})
+        self.assertNotIn(CART_SESSION_ID, self.request.session)
+        self.assertNotIn(CART_SUMMARY_ID, self.request.session)
+        self.assertEqual(REDIS.hget(f"cart:{self.request.session['cart_id']}", "p5"), b"2")
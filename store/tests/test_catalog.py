@@ -0,0 +1,373 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from store.models import FacetCount, Product, ProductImage, ProductVariant
+from store.caching import get_product_versions
+from store.services.facets import rebuild_facets
+from store.services.orders import recount_sales
+from store.tests.base import StoreTestCase, make_category, make_product, place_order
+
+
+@override_settings(CATALOG_PAGE_SIZE=2)
+class ProductListPaginationTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+        self.products = [
+            make_product(category=self.category, title=f"Suit {i}")
+            for i in range(5)
+        ]
+
+    def _walk(self, url):
+        seen = []
+        response = self.client.get(url)
+        while True:
+            page = response.context["page"]
+            seen.extend(p.id for p in page)
+            if not page.has_next:
+                return seen
+            response = self.client.get(f"{url}?{response.context['next_query']}")
+
+    def test_pages_cover_catalog_once_in_order(self):
+        seen = self._walk(reverse("store:product_list"))
+        expected = [p.id for p in sorted(self.products, key=lambda p: (p.created_at, p.id), reverse=True)]
+        self.assertEqual(seen, expected)
+
+    def test_insert_between_pages_does_not_shift_results(self):
+        url = reverse("store:product_list")
+        first = self.client.get(url)
+        first_ids = [p.id for p in first.context["page"]]
+
+        make_product(category=self.category, title="New drop", price="90.00")
+
+        second = self.client.get(f"{url}?{first.context['next_query']}")
+        second_ids = [p.id for p in second.context["page"]]
+        self.assertFalse(set(first_ids) & set(second_ids))
+        self.assertEqual(len(second_ids), 2)
+
+    def test_partial_request_renders_cards_only(self):
+        response = self.client.get(reverse("store:product_list"), {"partial": "1"})
+        self.assertTemplateUsed(response, "store/includes/product_grid_items.html")
+        self.assertTemplateNotUsed(response, "store/product_list.html")
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse("store:product_list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["page"]), 2)
+
+
+@override_settings(CATALOG_PAGE_SIZE=2)
+class ProductSortTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        category = make_category()
+        for i, price in enumerate(["300.00", "100.00", "200.00", "100.00", "50.00"]):
+            make_product(category=category, title=f"Suit {i}", price=price)
+        self.products = list(Product.objects.order_by("id"))
+
+    def _walk(self, params):
+        url = reverse("store:product_list")
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            page = response.context["page"]
+            seen.extend(p.id for p in page)
+            if not page.has_next:
+                return seen
+            response = self.client.get(f"{url}?{response.context['next_query']}")
+
+    def test_price_sorts_page_through_ties(self):
+        ascending = sorted(self.products, key=lambda p: (p.price, p.id))
+        self.assertEqual(self._walk({"sort": "price_asc"}), [p.id for p in ascending])
+        self.assertEqual(self._walk({"sort": "price_desc"}), [p.id for p in reversed(ascending)])
+
+    def test_bestselling_follows_checkout_counter(self):
+        place_order([{"product": self.products[2], "qty": 3}, {"product": self.products[4], "qty": 1}])
+        self.assertEqual(self._walk({"sort": "bestselling"})[:2], [self.products[2].id, self.products[4].id])
+
+    def test_recount_drops_cancelled_orders(self):
+        order = place_order([{"product": self.products[0], "qty": 2}])
+        order.status = "cancelled"
+        order.save()
+        self.assertEqual(recount_sales(), 1)
+        self.products[0].refresh_from_db()
+        self.assertEqual(self.products[0].sales_count, 0)
+
+    def test_unknown_sort_falls_back_to_newest(self):
+        response = self.client.get(reverse("store:product_list"), {"sort": "cheapest"})
+        self.assertEqual(response.context["sort"], "newest")
+
+
+@override_settings(CATALOG_PAGE_SIZE=50)
+class ProductCardQueryTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+
+    def _add_products(self, count):
+        for i in range(count):
+            product = make_product(category=self.category, title=f"Suit {i}")
+            ProductImage.objects.create(product=product, image=f"products/suit-{i}.jpg")
+
+    def _count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("store:product_list"))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_listing_query_count_is_constant(self):
+        self._count_queries()    # warm the site-wide caches
+        self._add_products(2)
+        small = self._count_queries()
+        self._add_products(6)
+        large = self._count_queries()
+        self.assertEqual(small, large)
+
+    def test_cards_projection_exposes_first_image(self):
+        self._add_products(1)
+        product = Product.objects.cards().get()
+        self.assertTrue(product.primary_image_url.endswith("products/suit-0.jpg"))
+
+
+class ProductSearchTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.suits = make_category()
+        self.navy = make_product(
+            category=self.suits, title="Navy Wool Suit", sku="NV-100", price="120.00",
+            description="Slim fit two piece",
+        )
+        self.grey = make_product(
+            category=self.suits, title="Grey Blazer", sku="GR-200", price="90.00",
+            description="Pairs with a navy trouser",
+        )
+
+    def _search(self, q):
+        response = self.client.get(reverse("store:product_list"), {"q": q})
+        return [p.id for p in response.context["page"]]
+
+    def test_title_match_ranks_above_description_match(self):
+        self.assertEqual(self._search("navy"), [self.navy.id, self.grey.id])
+
+    def test_prefix_and_sku_and_category(self):
+        self.assertEqual(self._search("blaz"), [self.grey.id])
+        self.assertEqual(self._search("NV-100"), [self.navy.id])
+        self.assertCountEqual(self._search("suits"), [self.navy.id, self.grey.id])
+
+    def test_index_follows_product_changes(self):
+        self.navy.title = "Charcoal Suit"
+        self.navy.save()
+        self.assertEqual(self._search("charcoal"), [self.navy.id])
+
+        self.grey.is_active = False
+        self.grey.save()
+        self.assertEqual(self._search("blazer"), [])
+
+        self.navy.delete()
+        self.assertEqual(self._search("charcoal"), [])
+
+    def test_category_rename_reindexes_products(self):
+        self.suits.name = "Tailoring"
+        self.suits.save()
+        self.assertCountEqual(self._search("tailoring"), [self.navy.id, self.grey.id])
+
+    def test_query_syntax_is_not_passed_through(self):
+        self.assertEqual(self._search('"navy (*'), [self.navy.id, self.grey.id])
+
+    @override_settings(CATALOG_PAGE_SIZE=2)
+    def test_search_pages_are_stable_when_products_are_added(self):
+        more = [
+            make_product(category=self.suits, title=f"Navy {name}", price="50.00")
+            for name in ("Tie", "Scarf", "Shirt", "Sock")
+        ]
+        url = reverse("store:product_list")
+        seen, cursor = [], None
+        for _ in range(2):
+            page = self.client.get(url, {"q": "navy", **({"cursor": cursor} if cursor else {})}).context["page"]
+            seen += [p.id for p in page]
+            cursor = page.next_cursor
+
+        # a new best match lands on page 1, which the shopper has already seen
+        make_product(category=self.suits, title="Navy Navy Suit", price="150.00")
+        while cursor:
+            page = self.client.get(url, {"q": "navy", "cursor": cursor}).context["page"]
+            seen += [p.id for p in page]
+            cursor = page.next_cursor
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertCountEqual(seen, [self.navy.id, self.grey.id, *(p.id for p in more)])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class FacetTests(TestCase):
+    def setUp(self):
+        self.category = make_category()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.navy = make_product(category=self.category, title="Navy Suit", price="4500.00")
+            self.grey = make_product(category=self.category, title="Grey Suit", price="12000.00")
+            ProductVariant.objects.create(product=self.navy, color="Navy", size="M", stock_qty=3)
+            ProductVariant.objects.create(product=self.navy, color="Navy", size="L", stock_qty=0)
+            ProductVariant.objects.create(product=self.grey, color="Grey", size="M", stock_qty=0)
+
+    def _count(self, facet, value, scope=0):
+        row = FacetCount.objects.filter(scope=scope, facet=facet, value=value).first()
+        return row.count if row else 0
+
+    def test_counts_are_precomputed_per_scope(self):
+        self.assertEqual(self._count("size", "M"), 2)
+        self.assertEqual(self._count("size", "L"), 1)
+        self.assertEqual(self._count("size", "M", scope=self.category.id), 2)
+        self.assertEqual(self._count("stock", "in"), 1)
+        self.assertEqual(self._count("stock", "out"), 1)
+        self.assertEqual(self._count("price", "2000-5000"), 1)
+        self.assertEqual(self._count("price", "10000+"), 1)
+
+    def test_variant_change_updates_counts_incrementally(self):
+        variant = self.grey.variants.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.stock_qty = 5
+            variant.save()
+        self.assertEqual(self._count("stock", "in"), 2)
+        self.assertEqual(self._count("stock", "out"), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.delete()
+        self.assertEqual(self._count("color", "Grey"), 0)
+
+    def test_refresh_runs_once_per_product_per_commit(self):
+        with mock.patch("store.services.facets.refresh_product_facets") as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                for size in ("S", "XL", "XXL"):
+                    ProductVariant.objects.create(product=self.grey, color="Grey", size=size, stock_qty=1)
+            refresh.assert_called_once_with(self.grey.id)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.grey.variants.filter(size="S").get().save()
+            self.assertEqual(refresh.call_count, 2)
+
+    def test_product_delete_releases_counts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.navy.delete()
+        self.assertEqual(self._count("color", "Navy"), 0)
+        self.assertEqual(self._count("size", "M"), 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        before = set(FacetCount.objects.filter(count__gt=0).values_list("scope", "facet", "value", "count"))
+        rebuild_facets()
+        after = set(FacetCount.objects.values_list("scope", "facet", "value", "count"))
+        self.assertEqual(before, after)
+
+    def test_listing_filters_by_facets(self):
+        url = reverse("store:product_list")
+        response = self.client.get(url, {"size": "L"})
+        self.assertEqual([p.id for p in response.context["page"]], [self.navy.id])
+
+        response = self.client.get(url, {"in_stock": "1"})
+        self.assertEqual([p.id for p in response.context["page"]], [self.navy.id])
+
+        response = self.client.get(url, {"price": ["2000-5000", "10000+"], "size": "M"})
+        self.assertCountEqual([p.id for p in response.context["page"]], [self.navy.id, self.grey.id])
+
+
+class FragmentCacheTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+        self.product = make_product(category=self.category, title="Navy Suit", price="120.00")
+
+    def test_product_change_bumps_version(self):
+        before = self.product.cache_version
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=1)
+        self.assertNotEqual(get_product_versions([self.product.id])[self.product.id], before)
+
+    def test_cached_card_refreshes_after_edit(self):
+        url = reverse("store:product_list")
+        self.assertContains(self.client.get(url), "PKR 120.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = "150.00"
+            self.product.save()
+        response = self.client.get(url)
+        self.assertContains(response, "PKR 150.00")
+        self.assertNotContains(response, "PKR 120.00")
+
+    def test_repeat_render_skips_card_queries(self):
+        ProductImage.objects.create(product=self.product, image="products/navy.jpg")
+        url = reverse("store:product_detail", args=[self.product.slug])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        tables = " ".join(q["sql"] for q in ctx.captured_queries)
+        self.assertNotIn("store_productvariant", tables)
+
+
+class ConditionalGetTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+        self.product = make_product(category=self.category, title="Navy Suit", price="120.00")
+        self.url = reverse("store:product_detail", args=[self.product.slug])
+
+    def _revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+    def test_unchanged_detail_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertNotIn("Last-Modified", first)
+        self.assertEqual(self._revalidate(self.url, first).status_code, 304)
+
+    def test_related_product_change_invalidates_detail(self):
+        other = make_product(category=self.category, title="Grey Suit", price="90.00")
+        first = self.client.get(self.url)
+        self.assertContains(first, "Grey Suit")
+        self.assertEqual(self._revalidate(self.url, first).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.price = "80.00"
+            other.save()
+        self.assertEqual(self._revalidate(self.url, first).status_code, 200)
+
+    def test_variant_change_invalidates_detail(self):
+        first = self.client.get(self.url)
+        ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=1)
+        self.assertEqual(self._revalidate(self.url, first).status_code, 200)
+
+    def test_cart_change_invalidates_pages(self):
+        listing = reverse("store:product_list")
+        first_detail = self.client.get(self.url)
+        first_list = self.client.get(listing)
+
+        session = self.client.session
+        session["cart"] = {str(self.product.id): {"qty": 1, "color": "", "size": ""}}
+        session.save()
+        self.assertEqual(self._revalidate(self.url, first_detail).status_code, 200)
+        self.assertEqual(self._revalidate(listing, first_list).status_code, 200)
+
+    def test_catalog_change_invalidates_listing(self):
+        listing = reverse("store:product_list")
+        first = self.client.get(listing)
+        self.assertEqual(self._revalidate(listing, first).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_product(category=self.category, title="Grey Suit", price="90.00")
+        self.assertEqual(self._revalidate(listing, first).status_code, 200)
+
+    def test_stock_count_change_keeps_listing_etag(self):
+        variant = ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=3)
+        listing = reverse("store:product_list")
+        first = self.client.get(listing)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.stock_qty = 2
+            variant.save(update_fields=["stock_qty"])
+        self.assertEqual(self._revalidate(listing, first).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            variant.stock_qty = 0
+            variant.save(update_fields=["stock_qty"])
+        self.assertEqual(self._revalidate(listing, first).status_code, 200)
@@ -0,0 +1,76 @@
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from store.categories import category_tree
+from store.models import FacetCount, ProductVariant
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+class CategoryTreeTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.men = make_category("Men")
+            self.suits = make_category("Suits", parent=self.men)
+            self.wedding = make_category("Wedding", parent=self.suits)
+            self.women = make_category("Women")
+
+    def test_paths_and_depths(self):
+        self.wedding.refresh_from_db()
+        self.assertEqual(self.wedding.path, f"{self.men.id:08d}/{self.suits.id:08d}/{self.wedding.id:08d}/")
+        self.assertEqual(self.wedding.depth, 2)
+
+    def test_moving_a_category_reroots_its_subtree(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suits.parent = self.women
+            self.suits.save()
+        self.wedding.refresh_from_db()
+        self.assertTrue(self.wedding.path.startswith(f"{self.women.id:08d}/"))
+        self.assertEqual(self.wedding.depth, 2)
+        self.assertEqual([c.id for c in category_tree().get("wedding").nav_children], [])
+        self.assertEqual([a.id for a in category_tree().ancestors(self.wedding)], [self.women.id, self.suits.id])
+
+    def test_listing_includes_descendant_categories(self):
+        tux = make_product(category=self.wedding, title="Tuxedo")
+        make_product(category=self.women, title="Saree")
+        response = self.client.get(reverse("store:product_list"), {"cat": self.men.slug})
+        self.assertEqual([p.id for p in response.context["page"]], [tux.id])
+
+    def test_nav_is_served_from_the_tree(self):
+        url = reverse("store:product_list")
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertContains(response, "Suits")
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "store_category"' in q["sql"]])
+
+    def test_tree_rebuilds_after_save(self):
+        self.assertIn(self.women, category_tree().roots)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.women.is_active = False
+            self.women.save()
+        self.assertNotIn(self.women.id, [c.id for c in category_tree().roots])
+
+    def test_facet_counts_roll_up_to_ancestors(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            product = make_product(category=self.wedding, title="Tuxedo")
+            ProductVariant.objects.create(product=product, color="Black", size="M", stock_qty=1)
+
+        def count(scope):
+            row = FacetCount.objects.filter(scope=scope, facet="color", value="Black").first()
+            return row.count if row else 0
+
+        self.assertEqual([count(c.id) for c in (self.men, self.suits, self.wedding)], [1, 1, 1])
+
+        with self.captureOnCommitCallbacks(execute=True), mock.patch("store.services.facets.rebuild_facets") as rebuild:
+            self.suits.parent = self.women
+            self.suits.save()
+        self.assertEqual(count(self.men.id), 0)
+        self.assertEqual(count(self.women.id), 1)
+        self.assertEqual([count(c.id) for c in (self.suits, self.wedding)], [1, 1])
+        self.assertEqual(FacetCount.objects.get(scope=0, facet="color", value="Black").count, 1)
+        # only the ancestor scopes are recounted, never the whole catalog
+        rebuild.assert_not_called()
@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from store.models import ProductVariant
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+class RecordingPurgeBackend:
+    purged = []
+
+    def __init__(self, **options):
+        pass
+
+    def purge(self, keys):
+        self.purged.append(keys)
+
+
+@override_settings(CDN_PURGE_BACKEND="store.tests.test_cdn.RecordingPurgeBackend", CDN_PURGE_ASYNC=False)
+class SurrogateKeyTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        RecordingPurgeBackend.purged = []
+        self.suits = make_category()
+        self.product = make_product(category=self.suits)
+
+    def test_anonymous_home_is_tagged_for_the_cdn(self):
+        response = self.client.get(reverse("store:home"))
+        keys = response["Surrogate-Key"].split()
+        self.assertTrue({f"product-{self.product.id}", "home", "products", "site"} <= set(keys))
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn(f"s-maxage={settings.CDN_CACHE_TIMEOUT}", response["Cache-Control"])
+
+    def test_pages_with_a_csrf_token_stay_private(self):
+        for url in (reverse("store:product_list"), reverse("store:product_detail", args=[self.product.slug])):
+            response = self.client.get(url)
+            self.assertContains(response, "csrfmiddlewaretoken")
+            self.assertFalse(response.has_header("Surrogate-Key"))
+            self.assertIn("private", response["Cache-Control"])
+
+    def test_visitors_with_a_cart_get_private_responses(self):
+        self.client.post(reverse("store:cart_add", args=[self.product.id]), {"qty": 1})
+        response = self.client.get(reverse("store:product_detail", args=[self.product.slug]))
+        self.assertFalse(response.has_header("Surrogate-Key"))
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_admin_edits_purge_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = "90.00"
+            self.product.save()
+        self.assertIn(["product-%d" % self.product.id, "products"], RecordingPurgeBackend.purged)
+
+        RecordingPurgeBackend.purged = []
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=1)
+        self.assertIn([f"product-{self.product.id}"], RecordingPurgeBackend.purged)
+
+
+class NoScriptAddToCartTests(StoreTestCase):
+    """The catalog add-to-cart forms work as plain HTML posts."""
+
+    def setUp(self):
+        super().setUp()
+        suits = make_category()
+        self.product = make_product(category=suits)
+        self.client = Client(enforce_csrf_checks=True)
+
+    def _submit_add_form(self, page_url):
+        page = self.client.get(page_url).content.decode()
+        form = page[page.index(f'action="{reverse("store:cart_add", args=[self.product.id])}"'):]
+        token = form.split('name="csrfmiddlewaretoken" value="', 1)[1].split('"', 1)[0]
+        return self.client.post(
+            reverse("store:cart_add", args=[self.product.id]), {"csrfmiddlewaretoken": token, "qty": 1}
+        )
+
+    def test_listing_form_posts_without_javascript(self):
+        response = self._submit_add_form(reverse("store:product_list"))
+        self.assertRedirects(response, reverse("store:cart_detail"), fetch_redirect_response=False)
+
+    def test_detail_form_posts_without_javascript(self):
+        response = self._submit_add_form(reverse("store:product_detail", args=[self.product.slug]))
+        self.assertRedirects(response, reverse("store:cart_detail"), fetch_redirect_response=False)
+        self.assertEqual(self.client.session["cart_summary"]["count"], 1)
@@ -1,15 +1,15 @@
-from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from store.cart import CART_SESSION_ID
-from store.models import Category, Product, Order, OrderItem, PaymentTransaction
+from store.models import Order, OrderItem, PaymentTransaction
+from store.tests.base import StoreTestCase, make_category, make_product
 
 
-@override_settings(SECURE_SSL_REDIRECT=False)
-class CheckoutFlowTests(TestCase):
+class CheckoutFlowTests(StoreTestCase):
     def setUp(self):
-        self.category = Category.objects.create(name="Suits")
-        self.product = Product.objects.create(
+        super().setUp()
+        self.category = make_category()
+        self.product = make_product(
             category=self.category,
             title="Navy Suit",
             price="120.00",
@@ -0,0 +1,78 @@
+import csv
+import io
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store.models import ProductFeedItem, ProductVariant
+from store.services.feed import refresh_feed
+from store.tasks import refresh_product_feed
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+@override_settings(FEED_BASE_URL="https://shop.example", FEED_CURRENCY="PKR")
+class ProductFeedTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+        self.suit = make_product(category=self.category, title="Navy Suit", sku="NV")
+        ProductVariant.objects.create(product=self.suit, color="Navy", size="M", stock_qty=2, sku="NV-M")
+        ProductVariant.objects.create(product=self.suit, color="Navy", size="L", stock_qty=0)
+        self.tie = make_product(category=self.category, title="Tie", price="10.00")
+
+    def _csv(self):
+        response = self.client.get(reverse("store:product_feed_csv"))
+        return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_csv_feed_has_one_row_per_variant(self):
+        refresh_feed()
+        rows = self._csv()
+        by_id = {row["id"]: row for row in rows}
+        self.assertEqual(set(by_id), {"NV-M", f"{self.suit.id}-{self.suit.variants.get(size='L').id}", str(self.tie.id)})
+        self.assertEqual(by_id["NV-M"]["item_group_id"], "NV")
+        self.assertEqual(by_id["NV-M"]["price"], "100.00 PKR")
+        self.assertEqual(by_id["NV-M"]["link"], f"https://shop.example/product/{self.suit.slug}/")
+        self.assertEqual(by_id[str(self.tie.id)]["availability"], "in stock")
+
+    def test_xml_feed_is_well_formed(self):
+        refresh_feed()
+        response = self.client.get(reverse("store:product_feed_xml"))
+        root = ElementTree.fromstring(b"".join(response.streaming_content))
+        self.assertEqual(len(root.findall("channel/item")), 3)
+
+    def test_incremental_refresh_only_renders_changed_products(self):
+        self.assertEqual(refresh_feed(), (2, 0))
+        self.assertEqual(refresh_feed(), (0, 0))
+
+        self.tie.price = "12.00"
+        self.tie.save()
+        self.assertEqual(refresh_feed(), (1, 0))
+
+        self.suit.is_active = False
+        self.suit.save()
+        self.assertEqual(refresh_feed(), (0, 1))
+        self.assertEqual(list(ProductFeedItem.objects.values_list("product_id", flat=True)), [self.tie.id])
+
+    def test_unchanged_feed_revalidates(self):
+        refresh_feed()
+        url = reverse("store:product_feed_csv")
+        first = self.client.get(url)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+    def test_deleting_a_product_changes_the_etag(self):
+        refresh_feed()
+        url = reverse("store:product_feed_csv")
+        first = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tie.delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(str(self.tie.id), [row["id"] for row in self._csv()])
+
+
+class FeedScheduleTests(TestCase):
+    def test_beat_refreshes_the_feed(self):
+        entry = settings.CELERY_BEAT_SCHEDULE["refresh-product-feed"]
+        self.assertEqual(entry["task"], refresh_product_feed.name)
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from django.utils import timezone
+
+from store.cart import CART_SESSION_ID
+from store.models import FeaturedBanner, HomeBanner, Product
+from store.services.banners import active_banners
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+class HomePageCacheTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = make_category()
+        make_product(category=self.category, title="Navy Suit", price="120.00")
+
+    def test_anonymous_hit_is_served_without_queries(self):
+        url = reverse("store:home")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, "Navy Suit")
+        self.assertIn("Cookie", response["Vary"])
+
+    def test_banner_change_purges_cached_page(self):
+        url = reverse("store:home")
+        self.assertNotContains(self.client.get(url), "Winter Drop")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HomeBanner.objects.create(title="Winter Drop", image="banners/winter.jpg")
+        self.assertContains(self.client.get(url), "Winter Drop")
+
+    def test_visitor_with_cart_bypasses_cache(self):
+        url = reverse("store:home")
+        self.client.get(url)
+
+        product = Product.objects.get()
+        session = self.client.session
+        session[CART_SESSION_ID] = {str(product.id): {"qty": 1, "color": "", "size": ""}}
+        session.save()
+
+        # bulk_create skips signals, so only a fresh render can show it
+        Product.objects.bulk_create([Product(category=self.category, title="Flash Sale", slug="flash-sale", price="90.00")])
+        self.assertContains(self.client.get(url), "Flash Sale")
+
+
+class ScheduledBannerTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.live = HomeBanner.objects.create(
+            title="Eid Sale", image="banners/eid.jpg", ends_at=self.now + timedelta(hours=2)
+        )
+        self.next = FeaturedBanner.objects.create(
+            title="Winter", image="featured/winter.jpg", starts_at=self.now + timedelta(hours=1)
+        )
+
+    def test_active_set_expires_at_next_transition(self):
+        active = active_banners()
+        self.assertEqual(active["banner"], self.live)
+        self.assertEqual(active["featured"], [])
+        self.assertEqual(active["expires_at"], self.next.starts_at)
+
+        with self.assertNumQueries(0):
+            active_banners()
+
+    def test_swap_happens_on_time(self):
+        active_banners()
+        later = self.now + timedelta(hours=3)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            active = active_banners()
+        self.assertIsNone(active["banner"])
+        self.assertEqual(active["featured"], [self.next])
+        self.assertIsNone(active["expires_at"])
+
+    def test_home_page_cache_stops_at_transition(self):
+        response = self.client.get(reverse("store:home"))
+        self.assertContains(response, "Eid Sale")
+        self.assertIn("s-maxage=", response["Cache-Control"])
+        s_maxage = int(response["Cache-Control"].split("s-maxage=")[1].split(",")[0])
+        self.assertLessEqual(s_maxage, 3600)
+
+    def test_end_must_follow_start(self):
+        banner = HomeBanner(title="Bad", image="banners/bad.jpg", starts_at=self.now, ends_at=self.now)
+        with self.assertRaises(ValidationError):
+            banner.clean()
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+
+from store.caching import CATALOG_VERSION, get_version
+from store.images import derivative_name
+from store.models import ProductImage
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+def _upload(name="suit.png", size=(1000, 800)):
+    buffer = BytesIO()
+    Image.new("RGBA", size, (10, 20, 30, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(IMAGE_DERIVATIVES_ASYNC=False, IMAGE_DERIVATIVE_WIDTHS=[320, 640, 1600])
+class ImageDerivativeTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.media = tempfile.mkdtemp()
+        override = override_settings(MEDIA_ROOT=self.media)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+
+        self.category = make_category()
+        self.product = make_product(category=self.category)
+
+    def test_upload_generates_narrower_widths(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self.product, image=_upload())
+        image.refresh_from_db()
+
+        self.assertEqual(image.image_derivatives, [320, 640])
+        for fmt in ("webp", "jpeg"):
+            name = derivative_name(image.image.name, 640, fmt)
+            self.assertTrue(default_storage.exists(name))
+            with default_storage.open(name) as fh:
+                self.assertEqual(Image.open(fh).size, (640, 512))
+
+    def test_replacing_the_image_resets_derivatives(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(product=self.product, image=_upload())
+        image.refresh_from_db()
+        old_name = image.image.name
+        self.assertTrue(default_storage.exists(derivative_name(old_name, 320, "webp")))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.image = _upload("small.png", size=(300, 300))
+            image.save()
+        image.refresh_from_db()
+        self.assertEqual(image.image_derivatives, [])
+        self.assertFalse(default_storage.exists(derivative_name(old_name, 320, "webp")))
+        self.assertFalse(default_storage.exists(derivative_name(old_name, 640, "jpeg")))
+
+    def test_category_derivatives_skip_the_save_cascade(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.category.image = _upload("suits.png")
+            self.category.save()
+        derivatives = [cb for cb in callbacks if cb.__qualname__.startswith("schedule_derivatives")]
+        for callback in callbacks:
+            if callback not in derivatives:
+                callback()
+        # only the derivatives job is left
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.image_derivatives, [])
+        self.product.refresh_from_db()
+        touched = self.product.updated_at
+        catalog = get_version(CATALOG_VERSION)
+        with self.captureOnCommitCallbacks(execute=True):
+            derivatives[0]()
+        self.category.refresh_from_db()
+        self.product.refresh_from_db()
+        self.assertEqual(self.category.image_derivatives, [320, 640])
+        self.assertEqual(self.product.updated_at, touched)
+        self.assertEqual(get_version(CATALOG_VERSION), catalog)
+
+    def test_cards_render_srcset(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.create(product=self.product, image=_upload())
+        response = self.client.get(reverse("store:product_list"))
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, ".w320.webp 320w")
@@ -0,0 +1,99 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from store.models import Product, ProductVariant
+from store.services.inventory import availability_matrix, refresh_product_stock
+from store.tests.base import make_category, make_product, place_order
+
+
+class StockSnapshotTests(TestCase):
+    def setUp(self):
+        self.category = make_category()
+        self.product = make_product(category=self.category)
+        self.m = ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=2)
+        self.l = ProductVariant.objects.create(product=self.product, color="Navy", size="L", stock_qty=0)
+
+    def test_snapshot_follows_variant_edits(self):
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.total_stock, self.product.in_stock), (2, True))
+        self.assertEqual(self.product.available_sizes, "M")
+
+        self.m.stock_qty = 0
+        self.m.save()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.total_stock, self.product.in_stock), (0, False))
+        self.assertEqual(self.product.available_colors, "")
+
+    def test_variantless_products_use_their_own_lists(self):
+        plain = make_product(category=self.category, title="Tie", price="10.00", colors="red, blue")
+        plain.refresh_from_db()
+        self.assertEqual((plain.has_variants, plain.in_stock, plain.available_colors), (False, True, "red, blue"))
+
+    def test_checkout_decrement_updates_snapshot(self):
+        self.product.refresh_from_db()
+        place_order([{"product": self.product, "qty": 2, "color": "Navy", "size": "M"}], subtotal=200, total=200)
+        self.product.refresh_from_db()
+        self.assertFalse(self.product.in_stock)
+
+    def test_checkout_refreshes_each_product_once(self):
+        self.l.stock_qty = 3
+        self.l.save()
+        self.product.refresh_from_db()
+        saves = []
+        post_save.connect(lambda sender, **kw: saves.append(sender), sender=ProductVariant, weak=False,
+                          dispatch_uid="count-variant-saves")
+        self.addCleanup(post_save.disconnect, sender=ProductVariant, dispatch_uid="count-variant-saves")
+
+        with mock.patch("store.services.inventory.refresh_product_stock",
+                        wraps=refresh_product_stock) as refresh, self.captureOnCommitCallbacks(execute=True):
+            place_order([
+                {"product": self.product, "qty": 1, "variant": self.m},
+                {"product": self.product, "qty": 3, "variant": self.l},
+            ], subtotal=400, total=400)
+        self.assertEqual(saves, [])
+        refresh.assert_called_once_with(self.product.id)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.total_stock, self.product.available_sizes), (1, "M"))
+
+    def test_reconcile_detects_and_repairs_drift(self):
+        Product.objects.filter(pk=self.product.pk).update(total_stock=99, in_stock=False)
+
+        out = StringIO()
+        call_command("reconcile_stock", stdout=out)
+        self.assertIn("total_stock: 99 -> 2", out.getvalue())
+
+        call_command("reconcile_stock", "--fix", stdout=StringIO())
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.total_stock, self.product.in_stock), (2, True))
+
+
+class AvailabilityMatrixTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        category = make_category()
+        self.product = make_product(category=category)
+        ProductVariant.objects.create(product=self.product, color="Navy", size="M", stock_qty=2)
+        self.grey = ProductVariant.objects.create(product=self.product, color="Grey", size="L", stock_qty=1)
+
+    def test_matrix_marks_missing_and_sold_out_combinations(self):
+        self.product.refresh_from_db()
+        matrix = availability_matrix(self.product)
+        self.assertEqual((matrix["colors"], matrix["sizes"]), (["Navy", "Grey"], ["M", "L"]))
+        self.assertEqual(matrix["stock"], [[2, None], [None, 1]])
+
+    def test_variant_save_retires_cached_matrix(self):
+        self.product.refresh_from_db()
+        availability_matrix(self.product)
+        with self.assertNumQueries(0):
+            availability_matrix(self.product)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grey.stock_qty = 0
+            self.grey.save()
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEqual(availability_matrix(product)["stock"][1], [None, 0])
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from store.recent import RECENT_SESSION_ID
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+@override_settings(RECENTLY_VIEWED_SIZE=3)
+class RecentlyViewedTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        category = make_category()
+        self.products = [
+            make_product(category=category, title=f"Suit {i}")
+            for i in range(4)
+        ]
+
+    def _view(self, product):
+        return self.client.get(reverse("store:recently_viewed"), {"product": product.id})
+
+    def test_ring_keeps_most_recent_ids_only(self):
+        for product in [*self.products, self.products[1]]:
+            self._view(product)
+        ids = self.client.session[RECENT_SESSION_ID]
+        self.assertEqual(ids, [self.products[1].id, self.products[3].id, self.products[2].id])
+
+    def test_rail_excludes_current_product_and_hydrates_in_one_query(self):
+        self._view(self.products[0])
+        self._view(self.products[1])
+        # session load + the card query; the ring is unchanged so no save
+        with self.assertNumQueries(2):
+            response = self._view(self.products[1])
+        self.assertContains(response, "Suit 0")
+        self.assertNotContains(response, "Suit 1")
+
+    def test_repeat_view_does_not_write_the_session(self):
+        self._view(self.products[0])
+        response = self._view(self.products[0])
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_detail_page_stays_shareable(self):
+        response = self.client.get(reverse("store:product_detail", args=[self.products[0].slug]))
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertContains(response, 'id="recentlyViewed"')
+
+    def test_cart_page_shows_rail(self):
+        self._view(self.products[2])
+        self.assertContains(self.client.get(reverse("store:cart_detail")), "Suit 2")
@@ -0,0 +1,43 @@
+from django.urls import reverse
+
+from store.caching import get_version
+from store.models import Order, OrderItem, ProductRelation
+from store.services.related import RELATED_VERSION, rebuild_related_products
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+class RelatedProductsTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.suits = make_category()
+        self.shoes = make_category("Shoes")
+        self.suit = make_product(category=self.suits)
+        self.tie = make_product(category=self.shoes, title="Silk Tie", price="10.00")
+        self.shoe = make_product(category=self.shoes, title="Oxford", price="50.00")
+        self.other_suit = make_product(category=self.suits, title="Grey Suit")
+
+    def _order(self, *products, status="pending"):
+        order = Order.objects.create(full_name="A", phone="1", address="X", status=status)
+        for product in products:
+            OrderItem.objects.create(order=order, product=product, price=product.price)
+        return order
+
+    def test_build_ranks_by_co_purchase(self):
+        self._order(self.suit, self.tie)
+        self._order(self.suit, self.tie, self.shoe)
+        self._order(self.suit, self.shoe, status="cancelled")
+        version = get_version(RELATED_VERSION)
+        with self.captureOnCommitCallbacks(execute=True):
+            rebuild_related_products()
+        self.assertNotEqual(get_version(RELATED_VERSION), version)
+
+        ranked = list(ProductRelation.objects.filter(product=self.suit).values_list("related_id", flat=True))
+        self.assertEqual(ranked, [self.tie.id, self.shoe.id])
+        self.assertFalse(ProductRelation.objects.filter(product=self.other_suit).exists())
+
+    def test_detail_uses_relations_then_category(self):
+        self._order(self.suit, self.shoe)
+        rebuild_related_products()
+
+        response = self.client.get(reverse("store:product_detail", args=[self.suit.slug]))
+        self.assertEqual([p.id for p in response.context["related"]], [self.shoe.id, self.other_suit.id])
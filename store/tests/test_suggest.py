@@ -0,0 +1,47 @@
+from django.urls import reverse
+
+from store.models import ProductVariant
+from store.suggest import suggest
+from store.tests.base import StoreTestCase, make_category, make_product
+
+
+class SearchSuggestTests(StoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.suits = make_category("Wool Suits")
+        self.navy = make_product(category=self.suits, title="Navy Wool Suit", sku="NV-100")
+        make_product(category=self.suits, title="Hidden Suit", price="1.00", is_active=False)
+
+    def test_matches_any_word_start_sku_and_category(self):
+        self.assertEqual([row["label"] for row in suggest("wool")], ["Navy Wool Suit", "Wool Suits"])
+        self.assertEqual(suggest("nv-1")[0]["url"], reverse("store:product_detail", args=[self.navy.slug]))
+        self.assertEqual([row["label"] for row in suggest("SUIT")], ["Navy Wool Suit", "Wool Suits"])
+        self.assertEqual(suggest("  "), [])
+
+    def test_keystrokes_do_not_query_the_database(self):
+        suggest("n")
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("store:search_suggest"), {"q": "nav"})
+        self.assertEqual(response.json()["results"][0]["label"], "Navy Wool Suit")
+
+    def test_catalog_change_rebuilds_index(self):
+        suggest("n")
+        with self.captureOnCommitCallbacks(execute=True):
+            make_product(category=self.suits, title="Nehru Jacket", price="80.00")
+        self.assertIn("Nehru Jacket", [row["label"] for row in suggest("ne")])
+
+    def test_stock_and_price_changes_keep_the_index(self):
+        suggest("n")
+        with self.captureOnCommitCallbacks(execute=True):
+            variant = ProductVariant.objects.create(product=self.navy, color="Navy", size="M", stock_qty=3)
+            variant.stock_qty = 2
+            variant.save(update_fields=["stock_qty"])
+            self.navy.price = "90.00"
+            self.navy.save()
+        with self.assertNumQueries(0):
+            suggest("nav")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.navy.title = "Midnight Wool Suit"
+            self.navy.save()
+        self.assertEqual(suggest("mid")[0]["label"], "Midnight Wool Suit")
@@ -0,0 +1,49 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from store.services.warmup import warm_and_log, warm_cache, warm_urls
+from store.tests.base import make_category, make_product
+
+
+# worker threads use their own connections, so the rows must be committed
+class WarmCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.suits = make_category()
+        self.products = [
+            make_product(category=self.suits, title=f"Suit {i}", sales_count=i)
+            for i in range(3)
+        ]
+
+    def test_urls_cover_pages_best_sellers_first(self):
+        urls = warm_urls(products=2)
+        self.assertEqual(urls[:2], [reverse("store:home"), reverse("store:product_list")])
+        self.assertIn(f"{reverse('store:product_list')}?cat={self.suits.slug}", urls)
+        self.assertEqual(urls[-2:], [reverse("store:product_detail", args=[p.slug]) for p in self.products[:0:-1]])
+
+    def test_pages_render_concurrently(self):
+        results = warm_cache(concurrency=3)
+        self.assertEqual(len(results), 6)
+        self.assertEqual({status for _, status, _ in results}, {200})
+
+    def test_command_reports_timings(self):
+        out = StringIO()
+        call_command("warm_cache", "--concurrency=2", stdout=out)
+        self.assertIn("Warmed 6 page(s)", out.getvalue())
+        self.assertIn("Cache warm-up complete.", out.getvalue())
+
+    @override_settings(WARM_CACHE_CONCURRENCY=1)
+    def test_command_concurrency_defaults_to_setting(self):
+        with mock.patch("store.management.commands.warm_cache.warm_cache", return_value=[]) as warm:
+            call_command("warm_cache", stdout=StringIO())
+        self.assertEqual(warm.call_args.kwargs["concurrency"], 1)
+
+    def test_failures_are_logged_not_raised(self):
+        with mock.patch("store.services.warmup.warm_urls", side_effect=RuntimeError("db down")):
+            with self.assertLogs("store.services.warmup", level="ERROR"):
+                self.assertEqual(warm_and_log(None, 2), [])
@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .views import payment_webhooks
+from .views import api, feed, payment_webhooks
 
 app_name = "store"
 
@@ -9,12 +9,26 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("products/", views.product_list, name="product_list"),
     path("product/<slug:slug>/", views.product_detail, name="product_detail"),
+    path("search/suggest/", views.search_suggest, name="search_suggest"),
+    path("recently-viewed/", views.recently_viewed, name="recently_viewed"),
+
+    # Catalog API (read-only JSON)
+    path("api/catalog/", api.api_catalog_root, name="api_catalog"),
+    path("api/catalog/products/", api.api_products, name="api_products"),
+    path("api/catalog/products/<slug:slug>/", api.api_product_detail, name="api_product_detail"),
+    path("api/catalog/categories/", api.api_categories, name="api_categories"),
+    path("api/catalog/variants/", api.api_variants, name="api_variants"),
+    path("api/catalog/export.ndjson", api.api_export, name="api_export"),
+
+    # Product feed
+    path("feeds/products.csv", feed.product_feed, {"fmt": "csv"}, name="product_feed_csv"),
+    path("feeds/products.xml", feed.product_feed, {"fmt": "xml"}, name="product_feed_xml"),
 
     # Cart
     path("cart/", views.cart_detail, name="cart_detail"),
     path("cart/add/<int:product_id>/", views.cart_add, name="cart_add"),
-    path("cart/update/<int:product_id>/", views.cart_update, name="cart_update"),
-    path("cart/remove/<int:product_id>/", views.cart_remove, name="cart_remove"),
+    path("cart/update/<str:line_key>/", views.cart_update, name="cart_update"),
+    path("cart/remove/<str:line_key>/", views.cart_remove, name="cart_remove"),
 
     # Checkout / Order
     path("checkout/", views.checkout, name="checkout"),
@@ -1,5 +1,5 @@
 from .home import home
-from .catalog import product_list, product_detail
+from .catalog import product_list, product_detail, recently_viewed, search_suggest
 from .cart import cart_detail, cart_add, cart_update, cart_remove
 from .checkout import checkout, apply_coupon
 from .orders import order_success
@@ -8,6 +8,8 @@ __all__ = [
     "home",
     "product_list",
     "product_detail",
+    "search_suggest",
+    "recently_viewed",
     "cart_detail",
     "cart_add",
     "cart_update",
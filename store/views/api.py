@@ -0,0 +1,191 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import condition, require_GET
+
+from ..caching import CATALOG_VERSION, STOCK_VERSION, get_version
+from ..categories import TREE_VERSION, category_tree
+from ..models import Product, ProductVariant
+from ..pagination import keyset_paginate
+from .catalog import listing_page, requested_page_size
+
+
+PRODUCT_FIELDS = {
+    "id": lambda p: p.id,
+    "slug": lambda p: p.slug,
+    "title": lambda p: p.title,
+    "sku": lambda p: p.sku,
+    "price": lambda p: p.price,
+    "category": lambda p: p.category.slug,
+    "image": lambda p: p.primary_image_url,
+    "in_stock": lambda p: p.in_stock,
+    "total_stock": lambda p: p.total_stock,
+    "colors": lambda p: p.available_color_list(),
+    "sizes": lambda p: p.available_size_list(),
+    "is_new": lambda p: p.is_new,
+    "url": lambda p: reverse("store:product_detail", args=[p.slug]),
+    "updated_at": lambda p: p.updated_at,
+}
+
+VARIANT_FIELDS = {
+    "id": lambda v: v.id,
+    "product": lambda v: v.product.slug,
+    "color": lambda v: v.color,
+    "size": lambda v: v.size,
+    "sku": lambda v: v.sku,
+    "stock": lambda v: v.stock_qty,
+}
+
+PRODUCT_DETAIL_FIELDS = {
+    **PRODUCT_FIELDS,
+    "description": lambda p: p.description,
+    "images": lambda p: [img.image.url for img in p.images.all()],
+    "variants": lambda p: [_serialize(v, list(VARIANT_FIELDS), VARIANT_FIELDS) for v in p.active_variants],
+}
+
+CATEGORY_FIELDS = {
+    "id": lambda c: c.id,
+    "slug": lambda c: c.slug,
+    "name": lambda c: c.name,
+    "parent": lambda c: c.parent_id,
+    "depth": lambda c: c.depth,
+    "image": lambda c: c.image.url if c.image else "",
+    "tagline": lambda c: c.tagline,
+}
+
+
+def _fields(request, available):
+    """``?fields=id,title,price`` sparse fieldsets; everything by default."""
+    requested = [f.strip() for f in request.GET.get("fields", "").split(",") if f.strip()]
+    unknown = [f for f in requested if f not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return requested or list(available)
+
+
+def _serialize(obj, fields, available):
+    return {name: available[name](obj) for name in fields}
+
+
+def _next_url(request, page):
+    if not page.has_next:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = page.next_cursor
+    return f"{request.path}?{params.urlencode()}"
+
+
+def _catalog_etag(request, *args, **kwargs):
+    # public and visitor independent: only the catalog versions and the URL
+    # (stock counts are part of the payload, so their version is too)
+    raw = json.dumps([
+        request.get_full_path(),
+        get_version(CATALOG_VERSION), get_version(STOCK_VERSION), get_version(TREE_VERSION),
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _bad_request(exc):
+    return JsonResponse({"error": str(exc)}, status=400)
+
+
+# -----------------------
+# CATALOG API
+# -----------------------
+@require_GET
+def api_catalog_root(request):
+    return JsonResponse({
+        "products": reverse("store:api_products"),
+        "categories": reverse("store:api_categories"),
+        "variants": reverse("store:api_variants"),
+        "export": reverse("store:api_export"),
+    })
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def api_products(request):
+    try:
+        fields = _fields(request, PRODUCT_FIELDS)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    page, _, _, _ = listing_page(request)
+    return JsonResponse({
+        "results": [_serialize(p, fields, PRODUCT_FIELDS) for p in page],
+        "next": _next_url(request, page),
+    }, encoder=DjangoJSONEncoder)
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def api_product_detail(request, slug):
+    try:
+        fields = _fields(request, PRODUCT_DETAIL_FIELDS)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    product = get_object_or_404(Product.objects.cards(), slug=slug, is_active=True)
+    product.active_variants = list(product.variants.filter(is_active=True).select_related("product"))
+    return JsonResponse(_serialize(product, fields, PRODUCT_DETAIL_FIELDS), encoder=DjangoJSONEncoder)
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def api_categories(request):
+    try:
+        fields = _fields(request, CATEGORY_FIELDS)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    tree = category_tree()
+    categories = sorted((c for c in tree.by_id.values() if c.is_active), key=lambda c: (c.path, c.id))
+    return JsonResponse({"results": [_serialize(c, fields, CATEGORY_FIELDS) for c in categories]})
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def api_variants(request):
+    try:
+        fields = _fields(request, VARIANT_FIELDS)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    variants = ProductVariant.objects.filter(is_active=True, product__is_active=True).select_related("product")
+    if request.GET.get("product"):
+        variants = variants.filter(product__slug=request.GET["product"])
+
+    page = keyset_paginate(
+        variants, ordering=("id",), cursor=request.GET.get("cursor"), page_size=requested_page_size(request)
+    )
+    return JsonResponse({
+        "results": [_serialize(v, fields, VARIANT_FIELDS) for v in page],
+        "next": _next_url(request, page),
+    })
+
+
+@require_GET
+@condition(etag_func=_catalog_etag)
+def api_export(request):
+    """
+    Every active product as newline-delimited JSON, streamed in chunks so
+    memory stays flat however large the catalog is.
+    """
+    try:
+        fields = _fields(request, PRODUCT_FIELDS)
+    except ValueError as exc:
+        return _bad_request(exc)
+
+    products = Product.objects.cards().filter(is_active=True).order_by("id")
+
+    def rows():
+        for product in products.iterator(chunk_size=500):
+            yield json.dumps(_serialize(product, fields, PRODUCT_FIELDS), cls=DjangoJSONEncoder) + "\n"
+
+    response = StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+    response["Content-Disposition"] = 'attachment; filename="catalog.ndjson"'
+    return response
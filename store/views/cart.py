@@ -1,5 +1,8 @@
 from django.contrib import messages
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import get_token
 from django.shortcuts import render, get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.urls import reverse
 
 from ..cart import (
@@ -7,8 +10,10 @@ from ..cart import (
     cart_remove_item,
     cart_items_with_totals,
     cart_set_item,
+    cart_summary,
 )
 from ..models import Product, ProductVariant
+from ..recent import recently_viewed_products
 
 
 # -----------------------
@@ -19,9 +24,70 @@ def cart_detail(request):
     return render(request, "store/cart_detail.html", {
         "items": items,
         "total": total,
+        "recent": recently_viewed_products(request, exclude={it["product"].id for it in items}),
     })
 
 
+def _wants_json(request):
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def _wants_fragment(request):
+    return request.headers.get("HX-Request") == "true"
+
+
+def _line_json(line):
+    return {
+        "key": line["key"],
+        "qty": line["qty"],
+        "color": line["color"] or "",
+        "size": line["size"] or "",
+        "unit_price": str(line["unit_price"]),
+        "line_total": str(line["line_total"]),
+        "warning": line["warning"],
+    }
+
+
+def _reply(request, message, redirect_to, key=None, ok=True):
+    """
+    Redirect with a flash message for plain form posts. Script clients
+    (Accept: application/json, or HTMX's HX-Request) get the changed line,
+    the totals and the badge count instead, with no page render: the
+    mutation already priced the cart, so this costs no extra query.
+    """
+    if not (_wants_json(request) or _wants_fragment(request)):
+        (messages.success if ok else messages.error)(request, message)
+        return redirect(redirect_to)
+
+    status = 200 if ok else 400
+    summary = cart_summary(request)
+    line = None
+    if ok and key is not None:
+        items, _ = cart_items_with_totals(request)
+        line = next((it for it in items if it["key"] == key), None)
+
+    if _wants_json(request):
+        return JsonResponse({
+            "ok": ok,
+            "message": message,
+            "line": _line_json(line) if line else None,
+            "count": summary["count"],
+            "total": str(summary["total"]),
+        }, status=status)
+
+    # a bare fragment (no context processors): the line, plus the totals
+    # swapped out-of-band
+    response = HttpResponse(render_to_string("store/includes/cart_fragment.html", {
+        "key": key,
+        "line": line,
+        "total": summary["total"],
+        "csrf_token": get_token(request),
+    }), status=status)
+    response["X-Cart-Count"] = str(summary["count"])
+    response["X-Cart-Message"] = message
+    return response
+
+
 def cart_add(request, product_id):
     if request.method != "POST":
         return redirect("store:product_list")
@@ -37,46 +103,44 @@ def cart_add(request, product_id):
     fallback_url = referer or product_url
     success_url = referer or reverse("store:cart_detail")
 
-    variant_qs = ProductVariant.objects.filter(product=product, is_active=True)
+    if not product.in_stock:
+        return _reply(request, "This product is sold out.", fallback_url, ok=False)
 
-    if variant_qs.exists():
+    if product.has_variants:
+        variant_qs = ProductVariant.objects.filter(product=product, is_active=True)
         if not color or not size:
-            messages.error(request, "Please select a valid color & size.")
-            return redirect(fallback_url)
+            return _reply(request, "Please select a valid color & size.", fallback_url, ok=False)
 
         variant = variant_qs.filter(color=color, size=size).first()
         if not variant:
-            messages.error(request, "Please select a valid color & size.")
-            return redirect(fallback_url)
+            return _reply(request, "Please select a valid color & size.", fallback_url, ok=False)
 
         if qty > variant.stock_qty:
-            messages.error(request, f"Only {variant.stock_qty} left in stock.")
-            return redirect(fallback_url)
+            return _reply(request, f"Only {variant.stock_qty} left in stock.", fallback_url, ok=False)
+    else:
+        variant = None
 
-    cart_add_item(
+    key = cart_add_item(
         request,
         product_id=product.id,
         qty=qty,
         color=color,
-        size=size
+        size=size,
+        variant_id=variant.id if variant else None,
     )
-
-    messages.success(request, "Added to cart OK")
-    return redirect(success_url)
+    return _reply(request, "Added to cart OK", success_url, key=key)
 
 
-def cart_update(request, product_id):
+def cart_update(request, line_key):
     if request.method != "POST":
         return redirect("store:cart_detail")
 
     qty = request.POST.get("qty", 1)
-    cart_set_item(request, product_id=product_id, qty=qty)
+    cart_set_item(request, line_key, qty=qty)
+    return _reply(request, "Cart updated OK", reverse("store:cart_detail"), key=line_key)
 
-    messages.success(request, "Cart updated OK")
-    return redirect("store:cart_detail")
 
+def cart_remove(request, line_key):
+    cart_remove_item(request, line_key)
+    return _reply(request, "Removed from cart OK", reverse("store:cart_detail"), key=line_key)
 
-def cart_remove(request, product_id):
-    cart_remove_item(request, product_id)
-    messages.success(request, "Removed from cart OK")
-    return redirect("store:cart_detail")
@@ -1,37 +1,246 @@
+from django.conf import settings
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
+from django.template.loader import render_to_string
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.http import condition, require_GET
 
+from ..caching import CATALOG_VERSION, attach_product_versions, get_version, has_pending_messages, page_etag
+from ..categories import TREE_VERSION, category_tree
+from ..cdn import PRODUCTS_KEY, add_surrogate_keys
 from ..models import Product
+from ..pagination import KeysetPage, keyset_paginate, ranked_paginate
+from ..recent import recently_viewed_products, remember_product
+from ..search import search_ranked
+from ..services.facets import ALL_SCOPE, facet_counts, filter_by_facets
+from ..services.inventory import availability_matrix
+from ..services.related import RELATED_VERSION, related_products
+from ..suggest import suggest
+
+
+# ?sort= modes; each ends on id for the keyset cursor and has a matching
+# composite index on Product (see Product.Meta.indexes)
+SORT_ORDERS = {
+    "newest": ("-created_at", "-id"),
+    "price_asc": ("price", "id"),
+    "price_desc": ("-price", "-id"),
+    "bestselling": ("-sales_count", "-id"),
+}
+SORT_LABELS = (
+    ("newest", "Latest"),
+    ("price_asc", "Price: low to high"),
+    ("price_desc", "Price: high to low"),
+    ("bestselling", "Best selling"),
+)
+DEFAULT_SORT = "newest"
+LISTING_ORDER = SORT_ORDERS[DEFAULT_SORT]
+
+
+def requested_page_size(request):
+    default = settings.CATALOG_PAGE_SIZE
+    try:
+        size = int(request.GET.get("per_page", default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, settings.CATALOG_MAX_PAGE_SIZE))
+
+
+def requested_sort(request):
+    sort = request.GET.get("sort")
+    return sort if sort in SORT_ORDERS else DEFAULT_SORT
+
+
+def _is_partial(request):
+    return request.GET.get("partial") == "1" or request.headers.get("X-Requested-With") == "XMLHttpRequest"
+
+
+def _selected_facets(request):
+    return {
+        "color": [v for v in request.GET.getlist("color") if v],
+        "size": [v for v in request.GET.getlist("size") if v],
+        "price": [v for v in request.GET.getlist("price") if v],
+        "stock": ["in"] if request.GET.get("in_stock") == "1" else [],
+    }
+
+
+def _scan_matches(products, query):
+    # no full-text index on this database: plain scan
+    return products.filter(
+        Q(title__icontains=query) | Q(sku__icontains=query) |
+        Q(description__icontains=query) | Q(category__name__icontains=query)
+    )
+
+
+def _search_page(products, query, cursor, page_size, ordering=None):
+    """
+    Relevance-ranked results, or the matches in ``ordering`` when the shopper
+    picked a sort mode explicitly.
+    """
+    ranked = search_ranked(query)
+    if ranked is None:
+        products = _scan_matches(products, query)
+        return keyset_paginate(products, ordering=ordering or LISTING_ORDER, cursor=cursor, page_size=page_size)
+    ranked_ids = [pid for pid, _ in ranked]
+    if ordering:
+        products = products.filter(id__in=ranked_ids)
+        return keyset_paginate(products, ordering=ordering, cursor=cursor, page_size=page_size)
+
+    # in search mode the cursor is the last row's (rank, id)
+    allowed = set(products.filter(id__in=ranked_ids).values_list("id", flat=True))
+    page = ranked_paginate([row for row in ranked if row[0] in allowed], cursor=cursor, page_size=page_size)
+
+    by_id = {p.id: p for p in products.filter(id__in=page.items)}
+    items = [by_id[pid] for pid in page.items if pid in by_id]
+    return KeysetPage(items, page.next_cursor, page_size)
 
 
 # -----------------------
 # PRODUCT LIST
 # -----------------------
-def product_list(request):
-    products = Product.objects.filter(is_active=True).order_by("-created_at")
+def _list_etag(request):
+    # listings change with any catalog edit, so they follow the catalog counter
+    return page_etag(
+        request, "list", request.get_full_path(), _is_partial(request),
+        get_version(CATALOG_VERSION), get_version(TREE_VERSION),
+    )
+
 
+def listing_page(request):
+    """
+    The storefront's active-product listing for the request's category,
+    facet, search and cursor params. Shared with the JSON catalog API.
+    Returns (page, scope, selected facets, query).
+    """
+    products = Product.objects.cards().filter(is_active=True)
+
+    scope = ALL_SCOPE
     cat_slug = request.GET.get("cat")
     if cat_slug:
-        products = products.filter(category__slug=cat_slug)
+        category = category_tree().get(cat_slug)
+        if category:
+            # the category and all of its descendants
+            products = products.filter(category__path__startswith=category.path)
+            scope = category.id
+        else:
+            products = products.none()
 
-    return render(request, "store/product_list.html", {
-        "products": products,
-    })
+    selected = _selected_facets(request)
+    products = filter_by_facets(products, {facet: values for facet, values in selected.items() if facet != "stock"})
+    if selected["stock"]:
+        products = products.filter(in_stock=True)
+
+    query = (request.GET.get("q") or "").strip()
+    cursor = request.GET.get("cursor")
+    page_size = requested_page_size(request)
+    ordering = SORT_ORDERS[requested_sort(request)]
+
+    if query:
+        explicit = ordering if request.GET.get("sort") in SORT_ORDERS else None
+        page = _search_page(products, query, cursor, page_size, explicit)
+    else:
+        page = keyset_paginate(products, ordering=ordering, cursor=cursor, page_size=page_size)
+    return page, scope, selected, query
+
+
+@condition(etag_func=_list_etag)
+def product_list(request):
+    page, scope, selected, query = listing_page(request)
+    attach_product_versions(page.items)
+
+    next_query = ""
+    if page.has_next:
+        params = request.GET.copy()
+        params.pop("partial", None)
+        params["cursor"] = page.next_cursor
+        next_query = params.urlencode()
+
+    context = {
+        "products": page,
+        "page": page,
+        "next_query": next_query,
+        "query": query,
+        "sort": requested_sort(request),
+    }
+    category = category_tree().by_id.get(scope)
+    if _is_partial(request):
+        response = render(request, "store/includes/product_grid_items.html", context)
+        return add_surrogate_keys(response, PRODUCTS_KEY, category, *page.items)
+
+    context["facets"] = facet_counts(scope)
+    context["selected"] = selected
+    context["sort_options"] = SORT_LABELS
+    response = render(request, "store/product_list.html", context)
+    return add_surrogate_keys(response, PRODUCTS_KEY, category, *page.items)
+
+
+# -----------------------
+# SEARCH SUGGESTIONS
+# -----------------------
+@require_GET
+@cache_control(public=True, max_age=60)
+def search_suggest(request):
+    """Typeahead for the search box, answered from the in-process prefix index."""
+    query = (request.GET.get("q") or "")[:100]
+    return JsonResponse({"query": query, "results": suggest(query, settings.SEARCH_SUGGEST_LIMIT)})
 
 
 # -----------------------
 # PRODUCT DETAIL
 # -----------------------
+def _detail_etag(request, slug):
+    # no Last-Modified: the page also depends on the visitor (page_etag) and
+    # on the related products, which a product timestamp cannot express
+    if has_pending_messages(request):
+        return None
+    # Product.updated_at is also touched by image and variant changes
+    updated_at = Product.objects.filter(slug=slug, is_active=True).values_list("updated_at", flat=True).first()
+    if updated_at is None:
+        return None
+    # the related rail: its cards follow the catalog, its picks the relation table
+    return page_etag(
+        request, "detail", slug, updated_at.isoformat(),
+        get_version(CATALOG_VERSION), get_version(RELATED_VERSION), get_version(TREE_VERSION),
+    )
+
+
+@condition(etag_func=_detail_etag)
 def product_detail(request, slug):
-    product = get_object_or_404(Product, slug=slug, is_active=True)
+    product = get_object_or_404(Product.objects.select_related("category"), slug=slug, is_active=True)
     images = product.images.all()
 
-    related = Product.objects.filter(
-        is_active=True,
-        category=product.category
-    ).exclude(id=product.id).order_by("-created_at")[:4]
+    related = related_products(product, limit=4)
+    attach_product_versions([product, *related])
 
-    return render(request, "store/product_detail.html", {
+    response = render(request, "store/product_detail.html", {
         "product": product,
         "images": images,
         "related": related,
+        "matrix": availability_matrix(product),
     })
+    return add_surrogate_keys(response, product, product.category, *related)
+
+
+# -----------------------
+# RECENTLY VIEWED
+# -----------------------
+@require_GET
+@never_cache
+def recently_viewed(request):
+    """
+    The detail page's "recently viewed" rail, fetched after load so the page
+    itself stays the same for every visitor (CDN-cacheable). ``?product=``
+    records the view; the session is only written when the ring changes.
+    """
+    try:
+        current = int(request.GET.get("product", ""))
+    except ValueError:
+        current = None
+    if current:
+        remember_product(request, current)
+
+    # a bare fragment: rendered without the site-wide context processors
+    return HttpResponse(render_to_string("store/includes/recently_viewed.html", {
+        "recent": recently_viewed_products(request, exclude={current}),
+    }))
+
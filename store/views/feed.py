@@ -0,0 +1,30 @@
+from django.http import StreamingHttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from ..caching import get_version
+from ..services.feed import FEED_VERSION, stream_feed
+
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xml": "application/xml; charset=utf-8",
+}
+
+
+def _feed_etag(request, fmt):
+    return f"{fmt}-{get_version(FEED_VERSION)}"
+
+
+# -----------------------
+# PRODUCT FEED (Meta / Google Merchant)
+# -----------------------
+@require_GET
+@cache_control(public=True, max_age=3600)
+@condition(etag_func=_feed_etag)
+def product_feed(request, fmt):
+    """
+    Streams the pre-rendered feed rows; `build_product_feed` (or the
+    refresh_product_feed task) keeps them current.
+    """
+    return StreamingHttpResponse(stream_feed(fmt), content_type=CONTENT_TYPES[fmt])
@@ -1,25 +1,29 @@
 from django.shortcuts import render
-from django.utils import timezone
 
-from ..models import HomeBanner, FeaturedBanner, Product
+from ..caching import attach_product_versions, cache_anonymous_page
+from ..cdn import HOME_KEY, PRODUCTS_KEY, add_surrogate_keys
+from ..models import Product
+from ..services.banners import active_banners
 
 
 # -----------------------
 # HOME
 # -----------------------
+@cache_anonymous_page("home")
 def home(request):
-    banner = HomeBanner.objects.filter(is_active=True).first()
+    # the live banner set is cached until its next scheduled swap
+    banners = active_banners()
+    banner = banners["banner"]
+    featured_banners = banners["featured"]   # multiple featured (slider)
 
-    # multiple featured (slider)
-    now = timezone.now()
-    featured_banners = FeaturedBanner.objects.filter(
-        is_active=True
-    ).order_by("sort_order", "-created_at")
+    products = Product.objects.cards().filter(is_active=True).order_by("-created_at")[:8]
+    products = attach_product_versions(products)
 
-    products = Product.objects.filter(is_active=True).order_by("-created_at")[:8]
-
-    return render(request, "store/home.html", {
+    response = render(request, "store/home.html", {
         "banner": banner,
         "featured_banners": featured_banners,   # if you use slider section
         "products": products,
     })
+    # page and CDN copies must not outlive the current banner line-up
+    response.cache_until = banners["expires_at"]
+    return add_surrogate_keys(response, HOME_KEY, PRODUCTS_KEY, banner, *featured_banners, *products)